@@ -0,0 +1,113 @@
+import hashlib
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from logging_config import logger
+from shared_instance import SharedInstance
+from utils import BOILERPLATE_DB_PATH, BOILERPLATE_MIN_ARTICLES, BOILERPLATE_WINDOW_DAYS
+
+
+_WHITESPACE = re.compile(r"\s+")
+_DIGITS = re.compile(r"\d+")
+
+
+def paragraph_fingerprint(text: str) -> str:
+    """忽略大小写、空白和数字（版权年份、电话号码）后的段落指纹"""
+    normalized = _DIGITS.sub("0", _WHITESPACE.sub(" ", text.casefold()).strip())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class BoilerplateStore:
+    """
+    按新闻源统计段落指纹出现在多少篇文章中（SQLite 持久化，跨天累计）。
+    每篇文章只统计一次，同一篇文章再次解析（续爬、重爬、被其它列表页重复发现）不重复计数。
+    版权声明、关注我们、外链免责声明这类段落每篇文章都有，出现次数很快超过阈值，
+    在正文写入 news_results.json、送去生成摘要之前去掉。
+    """
+
+    def __init__(self, db_path: str = BOILERPLATE_DB_PATH, min_articles: int = BOILERPLATE_MIN_ARTICLES,
+                 window_days: int = BOILERPLATE_WINDOW_DAYS):
+        self.db_path = db_path
+        self.min_articles = min_articles
+        self.window_days = window_days
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS boilerplate ("
+                           "source TEXT NOT NULL, fingerprint TEXT NOT NULL, articles INTEGER NOT NULL, "
+                           "last_seen TEXT NOT NULL, sample TEXT, PRIMARY KEY (source, fingerprint))")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS boilerplate_articles ("
+                           "source TEXT NOT NULL, url TEXT NOT NULL, observed_date TEXT NOT NULL, "
+                           "PRIMARY KEY (source, url))")
+        self._conn.commit()
+        self._counts: dict[str, dict[str, int]] = {}
+
+    def _source_counts(self, source: str) -> dict[str, int]:
+        counts = self._counts.get(source)
+        if counts is None:
+            rows = self._conn.execute("SELECT fingerprint, articles FROM boilerplate WHERE source = ?", (source,))
+            counts = self._counts[source] = dict(rows.fetchall())
+        return counts
+
+    def observe(self, source: str, url: str, texts: list[str], today: str = None) -> None:
+        """
+        记录一篇文章中的段落，同一篇文章里重复的段落只计一次，已经记录过的文章不再计数
+        :param today: 爬取日期，与 prune 使用同一个日期计算窗口
+        """
+        today = today or datetime.now().strftime("%Y%m%d")
+        samples = {paragraph_fingerprint(text): text[:200] for text in texts if text}
+        if not samples:
+            return
+        with self._lock:
+            cursor = self._conn.execute("INSERT OR IGNORE INTO boilerplate_articles VALUES (?, ?, ?)",
+                                        (source, url, today))
+            if cursor.rowcount == 0:
+                return
+            counts = self._source_counts(source)
+            for fingerprint in samples:
+                counts[fingerprint] = counts.get(fingerprint, 0) + 1
+            self._conn.executemany(
+                "INSERT INTO boilerplate (source, fingerprint, articles, last_seen, sample) VALUES (?, ?, 1, ?, ?) "
+                "ON CONFLICT(source, fingerprint) DO UPDATE SET articles = articles + 1, last_seen = excluded.last_seen",
+                [(source, fingerprint, today, sample) for fingerprint, sample in samples.items()])
+            self._conn.commit()
+
+    def is_boilerplate(self, source: str, text: str) -> bool:
+        with self._lock:
+            return self._source_counts(source).get(paragraph_fingerprint(text), 0) >= self.min_articles
+
+    def strip(self, source: str, url: str, texts: list[str], today: str = None) -> list[str]:
+        """先记录本篇文章的段落，再去掉已确认是模板的段落"""
+        self.observe(source, url, texts, today)
+        return [text for text in texts if not self.is_boilerplate(source, text)]
+
+    def prune(self, today: str = None) -> int:
+        """删除窗口期内没有再出现的指纹"""
+        day = datetime.strptime(today, "%Y%m%d") if today else datetime.now()
+        window_start = (day - timedelta(days=self.window_days)).strftime("%Y%m%d")
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM boilerplate WHERE last_seen < ?", (window_start,))
+            self._conn.execute("DELETE FROM boilerplate_articles WHERE observed_date < ?", (window_start,))
+            self._conn.commit()
+            self._counts.clear()
+        logger.info(f"已清理 {cursor.rowcount} 个过期的模板段落指纹")
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store = SharedInstance(BoilerplateStore)
+
+
+def set_boilerplate_store(store: BoilerplateStore):
+    """替换共用的模板段落库。回放时换成内存库，重复回放同一期不会累加真实的段落计数"""
+    _default_store.set(store)
+
+
+def get_boilerplate_store() -> BoilerplateStore:
+    """各新闻源共用的模板段落库，段落计数按新闻源分开"""
+    return _default_store.get()
@@ -0,0 +1,91 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from logging_config import logger
+
+_breakers: dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+# 429 与 5xx 说明对方暂时不可用，可以重试；其它 4xx 是页面本身的问题，重试无意义
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    # 指数退避的基数和上限（秒），实际等待时间在 [0, min(cap, base * 2^(n-1))] 内随机
+    backoff_base: float = 1.0
+    backoff_cap: float = 10.0
+
+    def is_retryable(self, status: int | None) -> bool:
+        return status is None or status in RETRYABLE_STATUS
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+
+
+@dataclass
+class CircuitBreakerConfig:
+    # 连续失败多少次后熔断
+    failure_threshold: int = 5
+    # 熔断持续时间（秒），之后放行一个探测请求，成功则恢复
+    reset_timeout: float = 600.0
+
+
+class CircuitBreaker:
+    """
+    按域名的熔断器：连续失败达到阈值后，该域名剩余的请求直接放弃，
+    避免一个新闻源故障时每篇文章都要等到超时，拖长整期爬取时间。
+    """
+
+    def __init__(self, domain: str, config: CircuitBreakerConfig):
+        self.domain = domain
+        self.config = config
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.config.reset_timeout or self._probing:
+                return False
+            # 半开状态：只放行一个探测请求
+            self._probing = True
+            return True
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"{self.domain} 探测成功，熔断恢复")
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or (self._opened_at is None and self.failures >= self.config.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._probing = False
+                logger.error(f"{self.domain} 连续失败 {self.failures} 次，熔断 {self.config.reset_timeout:.0f} 秒")
+
+
+def get_circuit_breaker(url: str, config: CircuitBreakerConfig = None) -> CircuitBreaker:
+    """同一域名共用一个熔断器，以第一次创建时的配置为准"""
+    domain = urlsplit(url).netloc
+    with _breakers_lock:
+        breaker = _breakers.get(domain)
+        if breaker is None:
+            breaker = CircuitBreaker(domain, config or CircuitBreakerConfig())
+            _breakers[domain] = breaker
+        return breaker
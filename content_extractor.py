@@ -0,0 +1,98 @@
+from bs4 import Tag
+
+# 参与打分的段落最少字数，更短的段落（图注、署名）不计分，但仍可能随正文块保留
+MIN_SCORED_CHARS = 25
+# 段落中链接文字占比超过该值视为推荐阅读、导航等链接列表
+MAX_LINK_DENSITY = 0.33
+# 与最高分块同级、得分达到最高分该比例的块也属于正文（正文被拆成多个并列的 div 时）
+SIBLING_SCORE_RATIO = 0.2
+
+
+def link_density(node: Tag, text_len: int = None) -> float:
+    if text_len is None:
+        text_len = len(node.get_text(strip=True))
+    if text_len == 0:
+        return 0.0
+    link_len = sum(len(a.get_text(strip=True)) for a in node.find_all("a"))
+    return min(1.0, link_len / text_len)
+
+
+def _inside_link(p: Tag) -> bool:
+    # 推荐阅读常把整段放在 <a> 里
+    return p.find_parent("a") is not None
+
+
+def _paragraph_score(text: str) -> float:
+    # 越长、逗号越多的段落越像正文
+    return 1 + text.count(",") + text.count("，") + min(len(text) // 100, 3)
+
+
+def content_paragraphs(root: Tag, min_scored_chars: int = MIN_SCORED_CHARS) -> list[Tag]:
+    """
+    按文本密度和链接密度找出正文所在的块，只返回其中的 <p>（保持文档顺序）。
+    每个足够长的段落给父节点加分、给祖父节点加一半分，块得分再乘以 (1 - 链接密度)；
+    取最高分块及其得分相近的兄弟块，丢弃其中链接密度过高的段落。
+    最高分块只直接包含一个段落时（如 BBC 每段一个 text-block），改取它的父节点。
+    找不到可打分的段落时返回全部 <p>，保持原有行为。
+    """
+    paragraphs = root.find_all("p")
+    # id(节点) -> [节点, 得分, 直接包含的打分段落数]
+    scores: dict[int, list] = {}
+    for p in paragraphs:
+        text = p.get_text(strip=True)
+        if len(text) < min_scored_chars or _inside_link(p):
+            continue
+        score = _paragraph_score(text)
+        parent = p.parent
+        grandparent = parent.parent if parent is not None else None
+        for node, weight in ((parent, 1.0), (grandparent, 0.5)):
+            if isinstance(node, Tag):
+                entry = scores.setdefault(id(node), [node, 0.0, 0])
+                entry[1] += score * weight
+                if node is parent:
+                    entry[2] += 1
+    if not scores:
+        return paragraphs
+    for entry in scores.values():
+        entry[1] *= 1 - link_density(entry[0])
+    top, top_score, top_count = max(scores.values(), key=lambda entry: entry[1])
+    if top_score <= 0:
+        return paragraphs
+    if top_count == 1 and isinstance(top.parent, Tag):
+        top = top.parent
+        top_score = scores[id(top)][1] if id(top) in scores else top_score
+
+    blocks = {id(top)}
+    if top.parent is not None:
+        threshold = top_score * SIBLING_SCORE_RATIO
+        for sibling in top.parent.find_all(recursive=False):
+            entry = scores.get(id(sibling))
+            if entry and entry[1] >= threshold:
+                blocks.add(id(sibling))
+
+    kept = []
+    for p in paragraphs:
+        if id(p) not in blocks and not any(id(parent) in blocks for parent in p.parents):
+            continue
+        if _inside_link(p) or link_density(p) > MAX_LINK_DENSITY:
+            continue
+        kept.append(p)
+    return kept or paragraphs
+
+
+def _check_per_paragraph_blocks():
+    """回归检查：BBC 每段包在一个 text-block 里，正文段落必须全部保留，推荐阅读仍要去掉"""
+    from html_parser import make_soup
+    texts = ["Officials said the new railway line, which took six years to build, opens on Monday morning.",
+             "The project cost more than expected, according to the council, the operator and local residents.",
+             "Commuters will save about twenty minutes each way compared with the existing bus service."]
+    blocks = "".join(f'<div data-component="text-block"><p>{t}</p></div>' for t in texts)
+    related = '<div data-component="links-block"><p><a href="/a">Another story about railways</a></p></div>'
+    soup = make_soup(f"<html><body><article><h1>Title</h1>{blocks}{related}</article></body></html>")
+    kept = [p.get_text(strip=True) for p in content_paragraphs(soup.find("article"))]
+    assert kept == texts, kept
+
+
+if __name__ == "__main__":
+    _check_per_paragraph_blocks()
+    print("content_extractor ok")
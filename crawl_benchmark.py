@@ -0,0 +1,552 @@
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+
+from logging_config import logger
+from utils import RT, ALJ, BBC, CHINADAILY_EN, BENCHMARK_FOLDER_NAME, HTTP_POOL_SIZE
+
+# 固定的爬取日期，夹具中的链接日期与之对应，保证每次运行的结果可比
+BENCHMARK_DAY = "20250601"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+# 夹具正文的词表，选用不会触发敏感词过滤的普通词
+WORDS = ("river", "market", "council", "harbour", "library", "festival", "railway", "garden", "museum", "bridge",
+         "farmers", "students", "engineers", "weather", "season", "village", "station", "budget", "project", "school",
+         "energy", "coastal", "transport", "housing", "research", "orchestra", "harvest", "tourism", "factory",
+         "hospital", "volunteers", "airport", "stadium", "forest", "exports", "software", "bakery", "ferry",
+         "mountain", "planning", "residents", "commuters", "design", "traffic", "concert", "climate", "programme",
+         "district", "workshop", "archive", "officials", "report", "survey", "network", "reservoir", "cycling")
+BENCHMARK_SOURCES = (BBC, ALJ, RT, CHINADAILY_EN)
+
+
+@dataclass
+class BenchmarkOptions:
+    # 每个新闻源的文章数，也是爬虫的配额
+    articles: int = 30
+    repeat: int = 3
+    # 模拟服务器每个响应的延迟（秒）
+    latency: float = 0.0
+    # 该比例的文章页和图片第一次请求返回 503，重试后成功
+    error_rate: float = 0.0
+    # 默认不限速，只测爬虫本身；打开后使用各新闻源的线上限速配置
+    site_rate_limits: bool = False
+    sources: tuple[str, ...] = BENCHMARK_SOURCES
+    log_level: str = "WARNING"
+
+
+@dataclass
+class SourceFixture:
+    source: str
+    listing_urls: tuple[str, ...]
+    image_hosts: tuple[str, ...] = ()
+    # 不含查询参数的完整 url -> 页面内容
+    pages: dict[str, str] = field(default_factory=dict)
+
+    def add_listing(self, links: list[tuple[str, str]]):
+        for url in self.listing_urls:
+            self.pages[url] = _listing(links)
+
+    def hosts(self) -> list[str]:
+        return sorted({urlsplit(url).netloc for url in self.pages} | set(self.image_hosts))
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraphs(rng: random.Random, count: int) -> list[str]:
+    return [" ".join(_sentence(rng, rng.randint(10, 18)) for _ in range(rng.randint(2, 4))) for _ in range(count)]
+
+
+def _title(rng: random.Random, i: int) -> str:
+    return f"{_sentence(rng, 6)[:-1]} number {i}"
+
+
+def _listing(links: list[tuple[str, str]]) -> str:
+    items = "".join(f'<li><a href="{href}">{text}</a></li>' for href, text in links)
+    return f"<html><body><nav><a href=\"/\">Home</a></nav><ul>{items}</ul></body></html>"
+
+
+def _html(title: str, body: str) -> str:
+    return (f"<html><head><title>{title}</title></head><body>"
+            f"<header><nav><a href=\"/\">Home</a><a href=\"/news\">News</a></nav></header>{body}"
+            f"<footer><p>Copyright. All rights reserved.</p></footer></body></html>")
+
+
+def _related(links: list[tuple[str, str]]) -> str:
+    items = "".join(f'<li><p><a href="{href}">{text}</a></p></li>' for href, text in links[:4])
+    return f"<aside><h2>Related</h2><ul>{items}</ul></aside>"
+
+
+def bbc_fixture(count: int) -> SourceFixture:
+    """BBC：data-component="image-block" 中的 srcset 图片，data-component="text-block" 中的段落"""
+    rng = random.Random(BBC)
+    fixture = SourceFixture(BBC, ('https://www.bbc.com/news', 'https://www.bbc.com/business',
+                                  'https://www.bbc.com/innovation', 'https://www.bbc.com/future-planet',
+                                  'https://www.bbc.com'), ("ichef.bbci.co.uk",))
+    links = [(f"/news/articles/c{i:06d}bench", _title(rng, i)) for i in range(count)]
+    fixture.add_listing(links)
+    for i, (href, title) in enumerate(links):
+        blocks = []
+        for n, paragraph in enumerate(_paragraphs(rng, 8)):
+            if n in (0, 4):
+                srcset = ", ".join(f"https://ichef.bbci.co.uk/news/{w}/cpsprodpb/{i}_{n}.jpg.webp {w}w"
+                                   for w in (240, 480, 800, 1024, 1536))
+                blocks.append(f'<div data-component="image-block"><figure><img alt="" '
+                              f'src="https://ichef.bbci.co.uk/news/480/cpsprodpb/{i}_{n}.jpg.webp" '
+                              f'srcset="{srcset}"></figure></div>')
+            blocks.append(f'<div data-component="text-block"><p>{paragraph}</p></div>')
+        blocks.append('<div data-component="text-block"><p>Follow BBC News on social media for the latest '
+                      'updates from around the world.</p></div>')
+        fixture.pages["https://www.bbc.com" + href] = _html(
+            title, f"<article><h1>{title}</h1>{''.join(blocks)}</article>{_related(links)}")
+    return fixture
+
+
+def alj_fixture(count: int) -> SourceFixture:
+    """半岛：main#main-content-area 中带 ?resize 参数的 srcset 图片"""
+    rng = random.Random(ALJ)
+    fixture = SourceFixture(ALJ, ('https://www.aljazeera.com/', 'https://www.aljazeera.com/us-canada/',
+                                  'https://www.aljazeera.com/asia-pacific/'))
+    day = datetime.strptime(BENCHMARK_DAY, "%Y%m%d").strftime("%Y/%-m/%-d")
+    links = [(f"/news/{day}/bench-story-{i}", _title(rng, i)) for i in range(count)]
+    fixture.add_listing(links)
+    for i, (href, title) in enumerate(links):
+        image = f"https://www.aljazeera.com/wp-content/uploads/2025/06/bench-{i}.jpg"
+        srcset = ", ".join(f"{image}?resize={w}%2C{w * 2 // 3}&quality=80 {w}w" for w in (770, 1170, 1920))
+        paragraphs = "".join(f"<p>{p}</p>" for p in _paragraphs(rng, 8))
+        fixture.pages["https://www.aljazeera.com" + href] = _html(
+            title, f'<main id="main-content-area"><header><h1>{title}</h1></header>'
+                   f'<figure><img alt="" src="{image}?resize=770%2C513" srcset="{srcset}"></figure>'
+                   f'<div class="wysiwyg">{paragraphs}<p>Al Jazeera brings you the latest news and analysis '
+                   f'from around the world.</p></div></main>{_related(links)}')
+    return fixture
+
+
+def rt_fixture(count: int) -> SourceFixture:
+    """RT：div.article 中 picture 的第二个 source"""
+    rng = random.Random(RT)
+    fixture = SourceFixture(RT, ('https://www.rt.com/', 'https://www.rt.com/news/'), ("mf.b37mrtl.ru",))
+    links = [(f"/news/{610000 + i}-bench-story/", _title(rng, i)) for i in range(count)]
+    fixture.add_listing(links)
+    for i, (href, title) in enumerate(links):
+        paragraphs = "".join(f"<p>{p}</p>" for p in _paragraphs(rng, 8))
+        fixture.pages["https://www.rt.com" + href] = _html(
+            title, f'<div class="article"><h1>{title}</h1><div class="media"><picture>'
+                   f'<source media="(max-width: 480px)" srcset="https://mf.b37mrtl.ru/files/2025.06/m/{i}.jpg">'
+                   f'<source media="(min-width: 481px)" srcset="https://mf.b37mrtl.ru/files/2025.06/l/{i}.jpg">'
+                   f'<img src="https://mf.b37mrtl.ru/files/2025.06/m/{i}.jpg"></picture></div>'
+                   f'<div class="article__text">{paragraphs}<p>You can share this story on social media.</p>'
+                   f'</div></div>{_related(links)}')
+    return fixture
+
+
+def china_daily_en_fixture(count: int) -> SourceFixture:
+    """中国日报英文版：div#Content 中的图片和段落，链接中带日期"""
+    rng = random.Random(CHINADAILY_EN)
+    fixture = SourceFixture(CHINADAILY_EN, ('https://www.chinadaily.com.cn', 'https://www.chinadaily.com.cn/world',
+                                            'https://www.chinadaily.com.cn/business'), ("img2.chinadaily.com.cn",))
+    day = datetime.strptime(BENCHMARK_DAY, "%Y%m%d").strftime("%Y%m/%d")
+    links = [(f"//www.chinadaily.com.cn/a/{day}/WS{i:016d}.html", _title(rng, i)) for i in range(count)]
+    fixture.add_listing(links)
+    for i, (href, title) in enumerate(links):
+        paragraphs = "".join(f"<p>{p}</p>" for p in _paragraphs(rng, 8))
+        fixture.pages["https:" + href] = _html(
+            title, f'<div class="lft_art"><h1>{title}</h1><div id="Content">'
+                   f'<figure><img src="//img2.chinadaily.com.cn/images/{day}/{i}.jpeg"></figure>'
+                   f'{paragraphs}</div></div>{_related(links)}')
+    return fixture
+
+
+FIXTURES = {BBC: bbc_fixture, ALJ: alj_fixture, RT: rt_fixture, CHINADAILY_EN: china_daily_en_fixture}
+
+
+def _fixture_images(count: int = 6) -> list[bytes]:
+    from PIL import Image
+    images = []
+    for i in range(count):
+        buf = io.BytesIO()
+        Image.new("RGB", (1280, 720), (40 * i % 256, 90, 160)).save(buf, "JPEG", quality=85)
+        images.append(buf.getvalue())
+    return images
+
+
+class MockNewsServer:
+    """
+    本地模拟新闻站点：按请求的 Host 和路径返回夹具页面，以图片扩展名结尾的路径返回 JPEG。
+    每个响应延迟 latency 秒；按路径哈希选出 error_rate 比例的文章页和图片，第一次请求返回 503。
+    """
+
+    def __init__(self, fixtures: list[SourceFixture], latency: float = 0.0, error_rate: float = 0.0):
+        self.pages = {url: page.encode("utf-8") for fixture in fixtures for url, page in fixture.pages.items()}
+        self.listing_urls = {url.rstrip("/") for fixture in fixtures for url in fixture.listing_urls}
+        self.images = _fixture_images()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._failed: set[str] = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> str:
+        return "%s:%d" % self._server.server_address
+
+    def _should_fail(self, url: str) -> bool:
+        # 列表页失败会让整个新闻源没有链接，只对文章页和图片注入错误
+        if self.error_rate <= 0 or url.rstrip("/") in self.listing_urls:
+            return False
+        if zlib.crc32(url.encode("utf-8")) % 10000 >= self.error_rate * 10000:
+            return False
+        with self._lock:
+            if url in self._failed:
+                return False
+            self._failed.add(url)
+            return True
+
+    def respond(self, host: str, path: str) -> tuple[int, str, bytes]:
+        with self._lock:
+            self.requests += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        url = urlunsplit(("https", host, urlsplit(path).path, "", ""))
+        if self._should_fail(url):
+            return 503, "text/plain", b"unavailable"
+        if url.lower().endswith(IMAGE_EXTENSIONS):
+            return 200, "image/jpeg", self.images[zlib.crc32(url.encode("utf-8")) % len(self.images)]
+        page = self.pages.get(url) or self.pages.get(url.rstrip("/"))
+        if page is None:
+            return 404, "text/plain", b"not found"
+        return 200, "text/html; charset=utf-8", page
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # 支持 keep-alive，与线上站点一样复用连接
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, content_type, body = server.respond(self.headers.get("Host", ""), self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class MockServerAdapter(HTTPAdapter):
+    """把真实域名的请求改发到本地模拟服务器，Host 头保留原域名，爬虫代码无需改动"""
+
+    def __init__(self, address: str, **kwargs):
+        self.address = address
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.headers["Host"] = parts.netloc
+        request.url = urlunsplit(("http", self.address, parts.path, parts.query, ""))
+        return super().send(request, **kwargs)
+
+
+def _rss_mb(maxrss: int) -> float:
+    # Linux 上 ru_maxrss 的单位是 KB，macOS 上是字节
+    return maxrss / (1024 * 1024 if platform.system() == "Darwin" else 1024)
+
+
+def _timing_totals(metrics: dict, name: str) -> tuple[int, float]:
+    timings = [t for t in metrics["timings"] if t["name"] == name]
+    return sum(t["count"] for t in timings), sum(t["sum"] for t in timings)
+
+
+def _counter_total(metrics: dict, name: str) -> float:
+    return sum(c["value"] for c in metrics["counters"] if c["name"] == name)
+
+
+def _benchmark_scraper(scraper_cls, options: BenchmarkOptions):
+    from rate_limiter import RateLimitConfig
+
+    class BenchmarkScraper(scraper_cls):
+        # 只测首页解析路径，feed 解析另有 feed_parser
+        feed_urls = ()
+        article_quota = options.articles
+        fetch_budget = options.articles
+        if not options.site_rate_limits:
+            rate_limit = RateLimitConfig(rate=1000.0, burst=1000, max_rate=1000.0)
+            image_rate_limit = rate_limit
+
+    return BenchmarkScraper
+
+
+def _scraper_class(source: str):
+    import crawl_news
+    return {BBC: crawl_news.BbcScraper, ALJ: crawl_news.ALJScraper, RT: crawl_news.RTScraper,
+            CHINADAILY_EN: crawl_news.CNDailyENScraper}[source]
+
+
+def _mount_mock_server(address: str, hosts: list[str]):
+    from http_client import get_session
+    for host in hosts:
+        session = get_session(f"https://{host}/")
+        session.proxies.clear()
+        session.trust_env = False
+        adapter = MockServerAdapter(address, pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+
+def _crawl_in_child(source: str, address: str, hosts: list[str], options: dict, queue):
+    """
+    在独立进程中爬取一个新闻源：限速器、熔断器、连接池和各类索引都是进程内单例，
+    每次运行使用新进程和新的临时目录，互不影响，内存峰值也只反映这一次爬取。
+    """
+    options = BenchmarkOptions(**options)
+    logger.setLevel(options.log_level)
+    random.seed(0)
+    import crawl_news
+    from crawl_metrics import reset_metrics
+    from http_client import close_sessions
+
+    scraper_cls = _benchmark_scraper(_scraper_class(source), options)
+    with tempfile.TemporaryDirectory(prefix=f"bench_{source}_") as work_dir:
+        os.chdir(work_dir)
+        _mount_mock_server(address, hosts)
+        scraper = scraper_cls(source_url=hosts[0], source=source, news_type=source)
+        metrics = reset_metrics()
+        rss_before = _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        _start = time.perf_counter()
+        try:
+            asyncio.run(crawl_news.crawl_all_sources([scraper], BENCHMARK_DAY))
+        finally:
+            close_sessions()
+        seconds = time.perf_counter() - _start
+        rss_after = _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    snapshot = metrics.to_dict()
+    parse_count, parse_sum = _timing_totals(snapshot, "article_parse")
+    fetch_count, fetch_sum = _timing_totals(snapshot, "article_fetch")
+    image_count, image_sum = _timing_totals(snapshot, "image_download")
+    # 结果文件只保留前 SUB_LIST_LENGTH 篇，入选数以指标为准
+    articles = _counter_total(snapshot, "articles_accepted")
+    queue.put({
+        "articles": articles,
+        "seconds": seconds,
+        "articles_per_second": articles / seconds if seconds > 0 else 0.0,
+        "parse_ms": parse_sum / parse_count * 1000 if parse_count else 0.0,
+        "fetch_ms": fetch_sum / fetch_count * 1000 if fetch_count else 0.0,
+        "image_ms": image_sum / image_count * 1000 if image_count else 0.0,
+        "sleep_seconds": _counter_total(snapshot, "sleep_seconds"),
+        "peak_rss_mb": rss_after,
+        "rss_growth_mb": rss_after - rss_before,
+    })
+
+
+def _article_key(article) -> dict:
+    return {"url": article.url, "title": article.title or article.title_en,
+            "content": article.content_cn or article.content_en, "images": sorted(article.images)}
+
+
+def _replay_check_in_child(source: str, address: str, hosts: list[str], options: dict, queue):
+    """
+    先对模拟服务器录制一期，再按 auto_download_daily 的方式零延迟回放，返回两次得到的文章。
+    回放前会话已关闭，新会话不再指向模拟服务器，归档中缺少的请求只会失败，不会被补上。
+    样板段落的判定与文章完成的先后有关，两次都不剔除样板段落，结果才可比较。
+    """
+    options = BenchmarkOptions(**options)
+    logger.setLevel(options.log_level)
+    import crawl_news
+    from boilerplate import BoilerplateStore, set_boilerplate_store
+    from http_archive import RECORD, REPLAY_FAST, open_archive, close_archive
+    from http_client import close_sessions
+
+    scraper_cls = _benchmark_scraper(_scraper_class(source), options)
+    with tempfile.TemporaryDirectory(prefix=f"replay_{source}_") as work_dir:
+        os.chdir(work_dir)
+        _mount_mock_server(address, hosts)
+        set_boilerplate_store(BoilerplateStore(":memory:", min_articles=sys.maxsize))
+        open_archive(BENCHMARK_DAY, 0, RECORD)
+        try:
+            recorded = asyncio.run(crawl_news.crawl_all_sources(
+                [scraper_cls(source_url=hosts[0], source=source, news_type=source)], BENCHMARK_DAY))
+        finally:
+            close_sessions()
+            close_archive()
+        folders = crawl_news.prepare_replay(BENCHMARK_DAY, 0)
+        set_boilerplate_store(BoilerplateStore(":memory:", min_articles=sys.maxsize))
+        open_archive(BENCHMARK_DAY, 0, REPLAY_FAST)
+        try:
+            replayed = asyncio.run(crawl_news.crawl_all_sources(
+                [scraper_cls(source_url=hosts[0], source=source, news_type=source, **folders)], BENCHMARK_DAY))
+        finally:
+            close_sessions()
+            close_archive()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    queue.put({"recorded": sorted((_article_key(a) for a in recorded), key=lambda a: a["url"]),
+               "replayed": sorted((_article_key(a) for a in replayed), key=lambda a: a["url"])})
+
+
+def run_once(source: str, server: MockNewsServer, hosts: list[str], options: BenchmarkOptions,
+             target=_crawl_in_child) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=target, args=(source, server.address, hosts, asdict(options), queue))
+    process.start()
+    try:
+        while True:
+            try:
+                return queue.get(timeout=1)
+            except Empty:
+                # 子进程异常退出时不会有结果，不能一直等下去
+                if not process.is_alive() and queue.empty():
+                    raise RuntimeError(f"{source} 基准测试进程异常退出: {process.exitcode}")
+    finally:
+        process.join()
+
+
+def summarize(runs: list[dict]) -> dict:
+    """多次运行取中位数，内存取最大值"""
+    summary = {key: statistics.median(run[key] for run in runs)
+               for key in ("articles", "seconds", "articles_per_second", "parse_ms", "fetch_ms", "image_ms",
+                           "sleep_seconds")}
+    summary["peak_rss_mb"] = max(run["peak_rss_mb"] for run in runs)
+    summary["rss_growth_mb"] = max(run["rss_growth_mb"] for run in runs)
+    summary["runs"] = runs
+    return summary
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        return revision + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(options: BenchmarkOptions) -> dict:
+    fixtures = [FIXTURES[source](options.articles) for source in options.sources]
+    results = {}
+    with MockNewsServer(fixtures, options.latency, options.error_rate) as server:
+        for fixture in fixtures:
+            hosts = fixture.hosts()
+            runs = []
+            for i in range(options.repeat):
+                run = run_once(fixture.source, server, hosts, options)
+                logger.warning(f"{fixture.source} 第 {i + 1} 次: {run['articles']} 篇，{run['seconds']:.2f} 秒，"
+                               f"{run['articles_per_second']:.2f} 篇/秒，解析 {run['parse_ms']:.1f} ms/篇，"
+                               f"内存峰值 {run['peak_rss_mb']:.0f} MB")
+                runs.append(run)
+            results[fixture.source] = summarize(runs)
+    return {"revision": git_revision(), "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(), "options": asdict(options),
+            "results": results}
+
+
+def check_replay(options: BenchmarkOptions) -> list[str]:
+    """
+    对每个新闻源做一次录制 -> 回放，回放提取的文章必须与录制时完全一致。
+    :return: 不一致的新闻源
+    """
+    fixtures = [FIXTURES[source](options.articles) for source in options.sources]
+    mismatched = []
+    with MockNewsServer(fixtures, options.latency, options.error_rate) as server:
+        for fixture in fixtures:
+            outcome = run_once(fixture.source, server, fixture.hosts(), options, target=_replay_check_in_child)
+            recorded, replayed = outcome["recorded"], outcome["replayed"]
+            if not recorded or recorded != replayed:
+                mismatched.append(fixture.source)
+                logger.error(f"{fixture.source} 回放结果与录制不一致: 录制 {len(recorded)} 篇，回放 {len(replayed)} 篇")
+            else:
+                logger.warning(f"{fixture.source} 录制与回放一致，共 {len(recorded)} 篇")
+    return mismatched
+
+
+def write_report(report: dict, folder: str = BENCHMARK_FOLDER_NAME) -> str:
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['revision']}.json")
+    with open(path, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2)
+    return path
+
+
+def format_report(report: dict, baseline: dict = None) -> str:
+    """输出各新闻源的中位数；给出基线时附上相对基线的变化"""
+    columns = (("articles_per_second", "篇/秒"), ("parse_ms", "解析ms"), ("fetch_ms", "请求ms"),
+               ("image_ms", "图片ms"), ("peak_rss_mb", "内存MB"))
+    lines = [f"revision {report['revision']}" + (f"  vs  {baseline['revision']}" if baseline else "")]
+    for source, summary in report["results"].items():
+        cells = []
+        for key, label in columns:
+            cell = f"{label} {summary[key]:.2f}"
+            base = (baseline or {}).get("results", {}).get(source, {}).get(key)
+            if base:
+                cell += f" ({(summary[key] - base) / base:+.1%})"
+            cells.append(cell)
+        lines.append(f"{source:6s} {int(summary['articles']):3d} 篇  " + "  ".join(cells))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="在本地模拟新闻站点上对各新闻源爬虫做基准测试")
+    parser.add_argument("--articles", type=int, default=30, help="每个新闻源的文章数")
+    parser.add_argument("--repeat", type=int, default=3, help="每个新闻源运行次数，结果取中位数")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟服务器每个响应的延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="第一次请求返回 503 的文章页和图片比例")
+    parser.add_argument("--site-rate-limits", action="store_true", help="使用各新闻源的线上限速配置")
+    parser.add_argument("--sources", nargs="+", default=list(BENCHMARK_SOURCES), choices=BENCHMARK_SOURCES)
+    parser.add_argument("--compare", type=str, default=None, help="与之前保存的结果文件对比")
+    parser.add_argument("--check-replay", action="store_true", help="只检查录制 -> 回放提取的文章是否一致")
+    args = parser.parse_args()
+    # --check-replay 同样使用这些模拟服务器参数，注入错误时检查重试后的回放结果
+    options = BenchmarkOptions(articles=args.articles, repeat=args.repeat, latency=args.latency,
+                               error_rate=args.error_rate, site_rate_limits=args.site_rate_limits,
+                               sources=tuple(args.sources))
+    if args.check_replay:
+        failed = check_replay(options)
+        print("录制与回放一致" if not failed else f"回放结果不一致: {failed}")
+        raise SystemExit(1 if failed else 0)
+    report = run_benchmark(options)
+    path = write_report(report)
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    print(format_report(report, baseline))
+    print(f"结果已保存到 {path}")
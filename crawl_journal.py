@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+
+from logging_config import logger
+from utils import NewsArticle
+
+# 文章通过所有过滤并下载完图片
+ACCEPTED = "accepted"
+# 被过滤（标题、敏感词、近似重复等），续爬时不再处理
+REJECTED = "rejected"
+# 请求失败或图片下载失败，续爬时重试；已解析出的文章一并记录，重试时不再请求文章页
+FAILED = "failed"
+# 整个新闻源爬取完成
+DONE = "done"
+
+
+class CrawlJournal:
+    """
+    单个新闻源一期爬取的逐篇日志（JSON Lines，只追加）。每篇文章处理完立即写一行，
+    进程中断后重跑时据此恢复已入选的文章、跳过已过滤的链接，只补做没完成的部分。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.done = False
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 中断时最后一行可能只写了一半
+                    logger.warning(f"{self.path} 跳过不完整的记录: {line[:100]}")
+                    continue
+                if entry.get("status") == DONE:
+                    self.done = True
+                elif entry.get("url"):
+                    self.entries[entry["url"]] = entry
+        logger.info(f"{self.path} 已加载 {len(self.entries)} 条爬取记录，完成={self.done}")
+
+    def start(self):
+        """新闻源目录创建后立即创建日志文件，之后目录存在而没有日志的只可能是旧版本生成的"""
+        if not os.path.exists(self.path):
+            open(self.path, "a", encoding="utf-8").close()
+
+    def _append(self, entry: dict):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as journal_file:
+                journal_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                journal_file.flush()
+
+    def record(self, url: str, idx: int, status: str, reason: str = None, article: NewsArticle = None):
+        entry = {"url": url, "idx": idx, "status": status, "reason": reason,
+                 "article": article.to_dict() if article else None}
+        self.entries[url] = entry
+        self._append(entry)
+
+    def mark_done(self):
+        self.done = True
+        self._append({"status": DONE})
+
+    def is_settled(self, url: str) -> bool:
+        """已入选或已被过滤的链接，续爬时不再处理"""
+        entry = self.entries.get(url)
+        return entry is not None and entry["status"] in (ACCEPTED, REJECTED)
+
+    def accepted(self) -> list[tuple[int, NewsArticle]]:
+        return [(entry["idx"], NewsArticle(**entry["article"])) for entry in self.entries.values()
+                if entry["status"] == ACCEPTED]
+
+    def extracted_article(self, url: str) -> NewsArticle | None:
+        """上次已解析成功、但图片没下载完的文章"""
+        entry = self.entries.get(url)
+        if entry and entry["status"] == FAILED and entry.get("article"):
+            return NewsArticle(**entry["article"])
+        return None
+
+    def has_failures(self) -> bool:
+        return any(entry["status"] == FAILED for entry in self.entries.values())
+
+    def idx_of(self, url: str) -> int | None:
+        entry = self.entries.get(url)
+        return entry["idx"] if entry else None
+
+    def next_idx(self) -> int:
+        return max((entry["idx"] for entry in self.entries.values()), default=-1) + 1
+
+    def spent(self) -> int:
+        """已消耗的抓取预算：失败的链接重试时不重复计算"""
+        return sum(1 for entry in self.entries.values() if entry["status"] in (ACCEPTED, REJECTED))
@@ -0,0 +1,137 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from logging_config import logger
+from utils import METRICS_FOLDER_NAME
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+METRIC_PREFIX = "news_crawl_"
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """计数器写精确值：整数原样输出，不用科学计数法；小数保留完整精度"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in key) + "}"
+
+
+class CrawlMetrics:
+    """
+    一期爬取的指标：计数器（请求数、字节数、按原因统计的过滤数）和耗时（次数、总和、最大值），
+    按新闻源、阶段等标签区分。爬取结束后写成 JSON 和 Prometheus textfile 两种格式。
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._timings: dict[tuple[str, tuple], list[float]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """记录一次耗时，汇总为 [次数, 总和, 最大值]"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            timing = self._timings.setdefault(key, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        _start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - _start, **labels)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            counters = [{"name": name, "labels": dict(key), "value": value}
+                        for (name, key), value in sorted(self._counters.items())]
+            timings = [{"name": name, "labels": dict(key), "count": count, "sum": total, "max": peak}
+                       for (name, key), (count, total, peak) in sorted(self._timings.items())]
+        return {"started_at": self.started_at, "elapsed": time.time() - self.started_at,
+                "counters": counters, "timings": timings}
+
+    def to_prometheus(self, **edition_labels) -> str:
+        """Prometheus textfile 格式，耗时输出为 _seconds_sum / _seconds_count / _seconds_max"""
+        edition = _label_key(edition_labels)
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+        declared = set()
+        for (name, key), value in counters:
+            metric = f"{METRIC_PREFIX}{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(edition + key)} {_format_value(value)}")
+        # 同一指标的所有样本必须连续，_max 是单独的指标，放在对应 summary 之后
+        names = list(dict.fromkeys(name for (name, _), _ in timings))
+        for name in names:
+            metric = f"{METRIC_PREFIX}{name}_seconds"
+            samples = [(_format_labels(edition + key), timing) for (n, key), timing in timings if n == name]
+            lines.append(f"# TYPE {metric} summary")
+            for labels, (count, total, _) in samples:
+                lines.append(f"{metric}_sum{labels} {total:.6f}")
+                lines.append(f"{metric}_count{labels} {count}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for labels, (_, _, peak) in samples:
+                lines.append(f"{metric}_max{labels} {peak:.6f}")
+        lines.append(f"# TYPE {METRIC_PREFIX}last_run_timestamp_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}last_run_timestamp_seconds{_format_labels(edition)} {time.time():.0f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, today: str, time_tag: int, suffix: str = "", folder: str = METRICS_FOLDER_NAME) -> str:
+        """写入 {today}_{time_tag}{suffix}.json 和同名 .prom，返回 json 路径"""
+        os.makedirs(folder, exist_ok=True)
+        base = os.path.join(folder, f"{today}_{time_tag}{suffix}")
+        data = self.to_dict()
+        data.update({"date": today, "time_tag": time_tag})
+        for path, content in ((base + ".json", json.dumps(data, ensure_ascii=False, indent=2)),
+                              (base + ".prom", self.to_prometheus(date=today, time_tag=time_tag))):
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as metrics_file:
+                metrics_file.write(content)
+            os.replace(tmp_path, path)
+        logger.info(f"爬取指标已写入 {base}.json / .prom")
+        return base + ".json"
+
+
+def reset_metrics() -> CrawlMetrics:
+    """开始新的一期爬取时清空指标"""
+    global _metrics
+    with _metrics_lock:
+        _metrics = CrawlMetrics()
+        return _metrics
+
+
+def get_metrics() -> CrawlMetrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = CrawlMetrics()
+        return _metrics
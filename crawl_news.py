@@ -1,163 +1,594 @@
+import asyncio
+import contextvars
 import json
-import threading
 from ollama_client import OllamaClient
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from bs4 import SoupStrainer
+from html_parser import (make_soup, parse_container, extract_title, extract_paragraphs, class_strainer, add_link,
+                         LINKS_ONLY)
 from abc import abstractmethod
 import re
 import os
 import requests
 from datetime import datetime
 from logging_config import logger
-from fake_useragent import UserAgent
-import random
+from http_client import http_get, close_sessions
+from http_cache import PageCache, CacheEntry
+from feed_parser import parse_feed
+from xml.etree import ElementTree
+from image_downloader import ImageDownloader
+from image_store import ImageStore, get_image_store, set_image_store
+from content_extractor import content_paragraphs
+import crawl_journal
+from crawl_journal import CrawlJournal
+from frontier import UrlFrontier, score_link
+from image_selection import pick_image, pick_srcset, limit_images
+from boilerplate import BoilerplateStore, get_boilerplate_store, set_boilerplate_store
+from crawl_metrics import get_metrics, reset_metrics
+from near_duplicates import NearDuplicateIndex, get_near_duplicate_index, set_near_duplicate_index
+from url_store import VisitedUrlStore, get_visited_url_store, set_visited_url_store
+from http_archive import (ARCHIVE_MODES, REPLAY, REPLAY_FAST, open_archive, close_archive, current_archive,
+                          is_replaying, build_replay_folder)
+from sensitive_words import get_matcher
+from rate_limiter import RateLimitConfig, get_rate_limiter
+from circuit_breaker import RetryPolicy, CircuitBreakerConfig, get_circuit_breaker
+import time
+from concurrent.futures import ThreadPoolExecutor
 from utils import *
 from video_generator import combine_videos
 
+# 锚文本以 LIVE / 直播 开头的是直播页，没有可用的正文
+LIVE_TITLE_PATTERN = re.compile(r"^\s*(live\b|直播)", re.IGNORECASE)
+# 当前文章累计的页面请求耗时（含限速等待和重试），用于从文章处理总耗时中分出解析耗时
+_page_fetch_seconds: contextvars.ContextVar[float] = contextvars.ContextVar("page_fetch_seconds", default=0.0)
 
-class NewsScraper:
 
-    def __init__(self, source_url: str, source: str, news_type: str, sleep_time: int = 0, times: int = 0):
+class ArticleResultWriter:
+    """
+    文章完成一篇就写一次 news_results.json，文件中始终按 idx 排序，
+    与完成顺序无关，folder / index_inner 保持稳定。
+    """
+
+    def __init__(self, json_path: str):
+        self.json_path = json_path
+        self._articles: dict[int, NewsArticle] = {}
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def restore(self, idx: int, article: NewsArticle):
+        """恢复续爬前已入选的文章，不立即写文件"""
+        self._articles[idx] = article
+
+    def add(self, idx: int, article: NewsArticle):
+        self._articles[idx] = article
+        self.flush()
+
+    def results(self) -> list[NewsArticle]:
+        return [self._articles[idx] for idx in sorted(self._articles)][:SUB_LIST_LENGTH]
+
+    def flush(self):
+        tmp_path = self.json_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as json_file:
+            json.dump([i.to_dict() for i in self.results()], json_file, ensure_ascii=False, indent=4)
+        os.replace(tmp_path, self.json_path)
+
+
+class NewsScraper:
+    # 列表页缓存的新鲜期（秒），新鲜期内不发请求，过期后发条件请求
+    listing_cache_max_age = 600
+    # 文章页只为正文容器建树，由子类指定
+    content_strainer: SoupStrainer = None
+    # 按域名共享的自适应限速配置
+    rate_limit = RateLimitConfig(rate=1.0, burst=4)
+    # 图片大多在单独的 CDN 域名上，能承受的请求速率比文章页高，单独限速
+    image_rate_limit = RateLimitConfig(rate=4.0, burst=8, max_rate=8.0)
+    retry_policy = RetryPolicy()
+    circuit_breaker = CircuitBreakerConfig()
+    # 每期需要的文章数，以及为凑够这些文章最多请求多少个文章页
+    article_quota = SUB_LIST_LENGTH
+    fetch_budget = SUB_LIST_LENGTH * 3
+    # 列表页锚文本的语言，决定预过滤时按中文标题还是英文标题检查
+    listing_lang = "en"
+    # 直播页的 url 特征
+    live_url_patterns = ("/live/", "/liveblog")
+    # 正文字数预算：超过后在之后的第一个句末标点处截断，后面的段落不再读取
+    content_budget = 4000
+    # 超过预算后最多再读的字数，用来找截断处的句末标点
+    content_budget_margin = 500
+    sentence_end = "."
+    # RSS/Atom feed 或 news sitemap，按顺序尝试，取到链接即停止；为空时只解析首页
+    feed_urls: tuple[str, ...] = ()
+
+    def __init__(self, source_url: str, source: str, news_type: str, times: int = 0,
+                 max_concurrency: int = DEFAULT_SOURCE_CONCURRENCY, news_folder: str = NEWS_FOLDER_NAME,
+                 cache_folder: str = HTTP_CACHE_FOLDER_NAME):
         self.source_url = source_url
         self.news_type = news_type
-        self.sleep_time = sleep_time
         self.times = times
         self.source = source + str(times)
-
-    def do_crawl_news(self, today: datetime.now().strftime("%Y%m%d")):
+        # 不带期数的新闻源名称，用于跨期统计
+        self.source_name = source
+        # 单个新闻源同时在途的请求数上限（列表页、文章页、图片共用）
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        # 文章输出目录和列表页缓存目录，回放时指向临时目录
+        self.news_folder = news_folder
+        self.page_cache = PageCache(cache_folder)
+        # 所有新闻源共用的图片下载池，由 crawl_all_sources 设置；单独爬取时在 do_crawl_news 中临时创建
+        self.image_downloader: ImageDownloader | None = None
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        # 延迟创建，保证信号量绑定在实际运行的事件循环上
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def do_crawl_news(self, today: datetime.now().strftime("%Y%m%d")):
         today_source_path = self.build_today_source_path(today)
-        if not os.path.exists(today_source_path):
-            return self.crawling_news_article(today)
-        else:
+        journal_path = os.path.join(today_source_path, CRAWL_JOURNAL_FILE_NAME)
+        # 没有爬取日志的旧目录保持原来的行为：目录存在即跳过
+        if os.path.exists(today_source_path) and not os.path.exists(journal_path):
             logger.info(f" {today_source_path} today_source_path had exists. ")
             return []
+        journal = CrawlJournal(journal_path)
+        if journal.done:
+            logger.info(f" {today_source_path} 已爬取完成，跳过。")
+            return []
+        if journal.entries:
+            logger.info(f"{self.source} 从中断处续爬，已入选 {len(journal.accepted())} 篇")
+        with get_metrics().timer("source_crawl", source=self.source):
+            if self.image_downloader is not None:
+                return await self.crawling_news_article(today, journal)
+            with ImageDownloader() as self.image_downloader:
+                try:
+                    return await self.crawling_news_article(today, journal)
+                finally:
+                    self.image_downloader = None
 
     def build_today_source_path(self, today):
-        today_source_path = os.path.join(NEWS_FOLDER_NAME, today, self.source)
+        today_source_path = os.path.join(self.news_folder, today, self.source)
         return today_source_path
 
     @abstractmethod
-    def extract_unlisted_urls(self, today: str):
+    async def extract_unlisted_urls(self, today: str):
         pass
 
     @abstractmethod
-    def extract_news_content(self, today: str):
+    async def extract_news_content(self, url: str, today: str):
         pass
 
-    def crawling_news_article(self, today):
+    async def crawling_news_article(self, today, journal: CrawlJournal = None):
         folder_path = self.create_folder(today)
-        urls = self.extract_unlisted_urls(today)
-        month_urls = load_month_urls(today[:6])
-        results = []
-        if urls is None:
+        if journal is None:
+            journal = CrawlJournal(os.path.join(folder_path, CRAWL_JOURNAL_FILE_NAME))
+        journal.start()
+        writer = ArticleResultWriter(os.path.join(folder_path, NEWS_JSON_FILE_NAME))
+        for idx, article in journal.accepted():
+            writer.restore(idx, article)
+        with get_metrics().timer("discover", source=self.source):
+            links = await self.discover_urls(today)
+        if links is None:
             logger.info(f" {self.source} 无法获取初始页面内容，程序退出。")
-            return results
-        logger.info(f"{self.source} has  {len(urls)}  urls,now extract first {SUB_LIST_LENGTH}")
-        for idx, url in enumerate(urls[:SUB_LIST_LENGTH]):
-            if url in month_urls:
-                logger.info(f" {self.source} 跳过本月已访问过的新闻: {url}")
+            writer.flush()
+            return writer.results()
+        frontier = self.build_frontier(links, today, journal)
+        quota, budget = self.article_quota, self.fetch_budget
+        logger.info(f"{self.source} has  {len(links)}  urls, {len(frontier)} in frontier,"
+                    f" quota {quota}, fetch budget {budget}")
+        # 续爬时已入选、已过滤的文章计入预算，新文章的序号接在日志之后
+        state = {"fetched": journal.spent(), "next_idx": journal.next_idx(), "in_flight": 0}
+        changed = asyncio.Condition()
+
+        def finished():
+            exhausted = not frontier or state["fetched"] >= budget
+            return len(writer) >= quota or (exhausted and state["in_flight"] == 0)
+
+        def can_start():
+            # 在途文章全部成功就能凑够配额时不再抓新的，配额满后立即停止
+            return (frontier and state["fetched"] < budget
+                    and len(writer) + state["in_flight"] < quota)
+
+        async def worker():
+            # 每个 worker 依次处理一篇文章：抓取、解析、过滤、下载图片；
+            # 多个 worker 之间的文章页请求、解析与图片下载相互重叠
+            while True:
+                async with changed:
+                    await changed.wait_for(lambda: finished() or can_start())
+                    if finished():
+                        return
+                    item = frontier.pop()
+                    # 上次失败的文章沿用原来的序号和目录
+                    idx = journal.idx_of(item.url)
+                    if idx is None:
+                        idx = state["next_idx"]
+                        state["next_idx"] += 1
+                    state["fetched"] += 1
+                    state["in_flight"] += 1
+                article = None
+                try:
+                    article = await self.crawl_one_article(idx, item.url, folder_path, today, journal)
+                finally:
+                    async with changed:
+                        state["in_flight"] -= 1
+                        if article:
+                            writer.add(idx, article)
+                        changed.notify_all()
+
+        # 在途文章数取并发上限的两倍：部分 worker 下载图片时，页面请求的并发名额仍能用满
+        width = max(1, min(self.max_concurrency * 2, quota))
+        await asyncio.gather(*[worker() for _ in range(width)])
+        results = writer.results()
+        logger.info(f"{self.source} ，脱敏，过滤后，共发现 {len(results)} 条新闻，"
+                    f"抓取文章页 {state['fetched']} 次，剩余候选 {len(frontier)} 个。")
+        writer.flush()
+        # 配额没满且有失败的文章时不标记完成，重跑时只重试这些文章
+        if len(writer) >= quota or not journal.has_failures():
+            journal.mark_done()
+        logger.info(f"{self.source} 爬取完成")
+        return results
+
+    def link_priority(self, url: str, text: str, rank: int, total: int, today: str) -> float:
+        """链接的抓取优先级，子类可以按站点特点调整"""
+        return score_link(url, text, rank, total, today)
+
+    def build_frontier(self, links: dict[str, str], today: str, journal: CrawlJournal = None) -> UrlFrontier:
+        """
+        过滤掉近期已访问、预过滤未通过以及本期已处理完的链接，其余按优先级放入待抓取队列。
+        links 的顺序即列表页（按 origin_url 顺序）或 feed 中的出现顺序。
+        """
+        visited_store = get_visited_url_store()
+        metrics = get_metrics()
+        frontier = UrlFrontier()
+        for rank, (url, text) in enumerate(links.items()):
+            if journal and journal.is_settled(url):
+                continue
+            if visited_store.contains(url, today):
+                logger.info(f" {self.source} 跳过近期已访问过的新闻: {url}")
+                metrics.inc("prefilter_rejections", source=self.source, reason="visited")
+                continue
+            # 用列表页的锚文本先做一次标题过滤，被过滤的文章不再请求文章页
+            reason = self.prefilter_reason(url, text)
+            if reason:
+                metrics.inc("prefilter_rejections", source=self.source, reason=reason)
                 continue
-            article = self.extract_news_content(url)
+            frontier.push(url, text, self.link_priority(url, text, rank, len(links), today))
+        return frontier
+
+    def title_reject_reason(self, url: str, title: str = None, title_en: str = None) -> str | None:
+        """
+        标题相关的过滤规则，文章页解析后与列表页预过滤共用。
+        :return: 被过滤的原因，通过时返回 None
+        """
+        if title and len(title) < 5:
+            logger.warning(f"{self.source} 标题过短: {url}")
+            return "title_too_short"
+        if title and self.is_sensitive_word_cn(title):
+            logger.warning(f"{self.source} 标题包含敏感词: {url}，{title}")
+            return "title_sensitive"
+        if title_en and self.is_sensitive_word_en(title_en):
+            logger.warning(f"{self.source} 英文标题包含敏感词: {url},{title_en}")
+            return "title_en_sensitive"
+        return None
+
+    def prefilter_reason(self, url: str, text: str) -> str | None:
+        """
+        请求文章页之前，用列表页的 url 和锚文本执行直播页与标题过滤。
+        锚文本为空时（纯图片链接）只检查 url，其余留给文章页解析后再过滤。
+        """
+        if any(pattern in url for pattern in self.live_url_patterns) or LIVE_TITLE_PATTERN.match(text):
+            logger.info(f"{self.source} 预过滤直播页: {url}")
+            return "live_blog"
+        if not text:
+            return None
+        if self.listing_lang == "cn":
+            return self.title_reject_reason(url, title=text)
+        return self.title_reject_reason(url, title_en=text)
+
+    def reject_reason(self, article: NewsArticle) -> str | None:
+        """
+        依次执行过滤规则，先检查标题等短字段，再扫描正文。
+        :return: 被过滤的原因，通过时返回 None
+        """
+        url = article.url
+        reason = self.title_reject_reason(url, article.title, article.title_en)
+        if reason:
+            return reason
+        if len(article.images) == 0:
+            logger.warning(f"{article.source} 未找到图片: {url}")
+            return "no_image"
+        if article.content_cn and len(article.content_cn) < 8:
+            logger.warning(f"{article.source} 内容过短: {url}")
+            return "content_too_short"
+        if article.content_cn and self.is_sensitive_word_cn(article.content_cn):
+            logger.warning(f"{article.source} 中文内容包含敏感词: {url},{article.content_cn}")
+            return "content_sensitive"
+        if article.content_en and self.is_sensitive_word_en(article.content_en):
+            logger.warning(f"{article.source} 英文内容包含敏感词: {url},{article.content_en}")
+            return "content_en_sensitive"
+        return None
+
+    async def crawl_one_article(self, idx, url, folder_path, today, journal: CrawlJournal) -> NewsArticle | None:
+        """处理一篇文章，结果（入选、被过滤的原因、失败的阶段）写入爬取日志"""
+        # 上次已解析并通过过滤、只是图片没下载完的文章，不再请求文章页
+        metrics = get_metrics()
+        article = journal.extracted_article(url)
+        if article is None:
+            _page_fetch_seconds.set(0.0)
+            _start = time.perf_counter()
+            article = await self.extract_news_content(url, today)
             if not article:
                 logger.warning(f"无法获取新闻内容: {url}")
-                continue
+                metrics.inc("article_failures", source=self.source, stage="fetch")
+                journal.record(url, idx, crawl_journal.FAILED, "fetch")
+                return None
+            metrics.observe("article_parse", time.perf_counter() - _start - _page_fetch_seconds.get(),
+                            source=self.source)
             article.times = self.times
             article.folder = "{:02d}".format(idx)
             article.index_inner = idx
             article.index_show = idx
-            if len(article.images) == 0:
-                logger.warning(f"{article.source} 未找到图片: {url}")
-                continue
-            if article.title and self.is_sensitive_word_cn(article.title):
-                logger.warning(f"{article.source} 标题包含敏感词: {url}，{article.title}")
-                continue
-            if article.title and len(article.title) < 5:
-                logger.warning(f"{article.source} 标题过短: {url}")
-                continue
-            if article.content_cn and self.is_sensitive_word_cn(article.content_cn):
-                logger.warning(f"{article.source} 中文内容包含敏感词: {url},{article.content_cn}")
-                continue
-            if article.title_en and self.is_sensitive_word_en(article.title_en):
-                logger.warning(f"{article.source} 英文标题包含敏感词: {url},{article.title_en}")
-                continue
-            if article.content_en and self.is_sensitive_word_en(article.content_en):
-                logger.warning(f"{article.source} 英文内容包含敏感词: {url},{article.content_en}")
-                continue
-            if article.content_cn and len(article.content_cn) < 8:
-                logger.warning(f"{article.source} 内容过短: {url}")
-                continue
-            if not do_download_images(article, folder_path):
-                logger.info(f"图片下载失败: {url}")
-                continue
-            article.folder = "{:02d}".format(idx)
-            results.append(article)
-        logger.info(f"{self.source} ，脱敏，过滤后，共发现 {len(results)} 条新闻。")
-        json_path = os.path.join(folder_path, NEWS_JSON_FILE_NAME)
-        json_results = [i.to_dict() for i in results[:SUB_LIST_LENGTH]]
-        with open(json_path, "w", encoding="utf-8") as json_file:
-            json.dump(json_results, json_file, ensure_ascii=False, indent=4)
-        logger.info(f"{self.source} 爬取完成")
-        return results
+            reason = self.reject_reason(article)
+            if reason:
+                metrics.inc("article_rejections", source=self.source, reason=reason)
+                journal.record(url, idx, crawl_journal.REJECTED, reason)
+                return None
+        # 其它新闻源或前几天已经有同一条新闻时不再下载图片、生成摘要和视频
+        duplicate = get_near_duplicate_index().claim(url, self.source_name, article.title or article.title_en,
+                                                     article.content_cn or article.content_en, today)
+        if duplicate:
+            logger.info(f"{self.source} 与 {duplicate.source} {duplicate.seen_date} 的 {duplicate.url} 是同一条新闻，跳过: {url}")
+            metrics.inc("article_rejections", source=self.source, reason="near_duplicate")
+            journal.record(url, idx, crawl_journal.REJECTED, "near_duplicate")
+            return None
+        if not await self.image_downloader.download_article_images(article, folder_path, self.image_rate_limit):
+            logger.info(f"图片下载失败: {url}")
+            get_near_duplicate_index().release(url)
+            metrics.inc("article_failures", source=self.source, stage="images")
+            journal.record(url, idx, crawl_journal.FAILED, "images", article)
+            return None
+        metrics.inc("articles_accepted", source=self.source)
+        journal.record(url, idx, crawl_journal.ACCEPTED, article=article)
+        return article
 
     @abstractmethod
     def origin_url(self):
         pass
 
+    def is_article_url(self, url: str) -> bool:
+        """链接是否指向文章页，子类按 url 特征过滤"""
+        return True
+
+    def extract_body(self, container, url: str, today: str) -> str:
+        """
+        只取正文块中的段落（去掉推荐阅读等链接块），去掉本新闻源的模板段落，再按字数预算截断。
+        非模板段落超过 content_budget + content_budget_margin 字后不再读取后面的段落，这些段落也不计入模板统计：
+        长文章末尾的版权声明等模板由篇幅较短的文章学到。余量内一直没有句末标点时，正文在余量处结束。
+        :param today: 爬取日期，模板段落按这个日期记录和清理
+        """
+        store = get_boilerplate_store()
+        nodes = content_paragraphs(container)
+        limit = self.content_budget + self.content_budget_margin
+        texts = []
+        length = 0
+        for p in nodes:
+            if length > limit:
+                break
+            text = p.get_text(strip=True)
+            texts.append(text)
+            if not store.is_boilerplate(self.source_name, text):
+                length += len(text) + 1
+        paragraphs = store.strip(self.source_name, url, texts, today)
+        if len(paragraphs) < len(texts):
+            logger.info(f"{self.source} 去掉 {len(texts) - len(paragraphs)} 段模板段落: {url}")
+        extracted = extract_paragraphs(paragraphs, self.content_budget, self.sentence_end)
+        unread = len(nodes) - len(texts)
+        if extracted.truncated or unread:
+            logger.info(f"{self.source} 正文超过 {self.content_budget} 字，截断 {extracted.dropped_chars} 字，"
+                        f"跳过 {extracted.dropped_paragraphs + unread} 段: {url}")
+        return extracted.text
+
+    async def discover_urls(self, today) -> dict[str, str] | None:
+        """
+        优先从 feed 获取当天的文章链接（一次小请求）；feed 不可用、没有当天的文章，
+        或候选少于 article_quota（较短的 RSS）时，再解析首页和栏目页补足，feed 中的链接排在前面。
+        :return: {完整链接: 标题}，feed 和首页都取不到时返回 None
+        """
+        links = {}
+        if self.feed_urls:
+            links = await self.extract_feed_urls(today)
+            if len(links) >= self.article_quota:
+                return links
+            if links:
+                logger.info(f"{self.source} feed 只有 {len(links)} 篇候选，少于配额 {self.article_quota}，解析首页补足")
+            else:
+                logger.warning(f"{self.source} feed 中没有当天的文章，退回首页解析")
+        listed = await self.extract_unlisted_urls(today)
+        if not links:
+            return listed
+        for url, title in (listed or {}).items():
+            links.setdefault(url, title)
+        return links
+
+    async def extract_feed_urls(self, today) -> dict[str, str]:
+        links_key = today or datetime.now().strftime("%Y%m%d")
+        for feed_url in self.feed_urls:
+            entry, unchanged = await self.fetch_listing_page(feed_url)
+            if entry is None:
+                logger.warning(f"{self.source} 无法获取 feed {feed_url}")
+                continue
+            if unchanged and isinstance(entry.links.get(links_key), dict):
+                links = entry.links[links_key]
+                logger.info(f"{feed_url} feed 未变化，复用已提取的 {len(links)} 个链接。")
+            else:
+                try:
+                    items = parse_feed(entry.body)
+                except ElementTree.ParseError as e:
+                    logger.warning(f"{self.source} feed 解析失败 {feed_url}: {e}")
+                    continue
+                links = {}
+                for item in items:
+                    if item.published_on(links_key) and self.is_article_url(item.url):
+                        links.setdefault(item.url, item.title)
+                entry.links = {links_key: links}
+                self.page_cache.save(entry, body_changed=False)
+                logger.info(f"{feed_url} feed 共 {len(items)} 条，当天的文章 {len(links)} 条。")
+            if links:
+                return links
+        return {}
+
     def is_sensitive_word_cn(self, word) -> bool:
-        cnt = 0
-        sensitive_words = ["平", "%%%", "习", "县", "杀", "总书记", "近","中国","香港","澳门","南京","新疆","西藏","宁夏"]  # 去除了重复项
-        for sensitive_word in sensitive_words:
-            if sensitive_word in word:
-                cnt += 1
-        return cnt > 1
-
-    def is_sensitive_word_en(self, word:str) -> bool:
-
-        chinese_regions = [
-            "China",  # 中国
-            "Hong Kong",  # 香港（中国特别行政区）
-            "Macao",  # 澳门（中国特别行政区）
-            "Nanjing",  # 南京（中国江苏省省会）
-            "Xinjiang",  # 新疆（中国新疆维吾尔自治区）
-            "Xizang",  # 西藏（中国西藏自治区）
-            "Ningxia"  # 宁夏（中国宁夏回族自治区）
-        ]
-        for sensitive_word in chinese_regions:
-            if sensitive_word.lower() in word.lower():
-                return True
-        return "Jinping" in word
+        # 命中 2 个及以上不同的中文敏感词才算敏感，词表见 config/sensitive_words.json
+        return get_matcher("cn").is_sensitive(word)
+
+    def is_sensitive_word_en(self, word: str) -> bool:
+        return get_matcher("en").is_sensitive(word)
 
     def create_folder(self, today=datetime.now().strftime("%Y%m%d")):
         folder_path = self.build_today_source_path(today)
         os.makedirs(folder_path, exist_ok=True)
         return folder_path
 
-    def fetch_page(self, url):
+    async def wait_rate_limit(self, url):
+        if is_replaying():
+            return
+        waited = await get_rate_limiter(url, self.rate_limit).acquire()
+        if waited > 0:
+            logger.info(f"{self.source} {url} 限速等待 {waited:.2f} 秒")
+            get_metrics().inc("sleep_seconds", waited, source=self.source, reason="rate_limit")
+
+    def limited_get(self, url, **kwargs) -> requests.Response:
+        """发出请求，并把状态码和耗时反馈给该域名的限速器"""
+        if is_replaying():
+            return http_get(url, timeout=10, **kwargs)
+        limiter = get_rate_limiter(url, self.rate_limit)
+        _start = time.time()
         try:
-            if self.sleep_time > 0:
-                randint = random.randint(self.sleep_time // 2, self.sleep_time)
-                logger.info(f"{self.source} {url} sleep {randint} seconds start")
-                time.sleep(randint)
-                logger.info(f"{self.source} {url} sleep {randint} seconds done")
-            ua = UserAgent()
-
-            ua_random = ua.random
-            headers = {"User-Agent": ua_random,
-                       "Accept-Language": "en-US,en;q=0.9", "DNT": "1",
-                       "Connection": "keep-alive",
-                       "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                       "Upgrade-Insecure-Requests": "1"
-                       }
-
-            response = requests.get(url, headers=headers, timeout=10, proxies=PROXY)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            logger.error(f"fetch_page请求失败: {url} 错误信息： {e}")
+            response = http_get(url, timeout=10, **kwargs)
+        except requests.RequestException:
+            limiter.record(None, time.time() - _start)
+            raise
+        limiter.record(response.status_code, time.time() - _start, response.headers.get("Retry-After"))
+        return response
+
+    async def fetch_with_retry(self, url, **kwargs) -> requests.Response | None:
+        """
+        幂等 GET：超时、连接失败、429/5xx 按指数退避加抖动重试；
+        域名熔断后直接放弃，不再等待超时。
+        :return: 成功（含 304）时返回响应，否则返回 None
+        """
+        breaker = get_circuit_breaker(url, self.circuit_breaker)
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            if not breaker.allow():
+                logger.warning(f"{self.source} {breaker.domain} 已熔断，跳过 {url}")
+                return None
+            try:
+                async with self.get_semaphore():
+                    await self.wait_rate_limit(url)
+                    response = await asyncio.to_thread(self.limited_get, url, **kwargs)
+                get_metrics().inc("http_requests", source=self.source, status=response.status_code)
+                response.raise_for_status()
+                breaker.record_success()
+                return response
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                if e.response is None:
+                    get_metrics().inc("http_requests", source=self.source, status="error")
+                if not self.retry_policy.is_retryable(status):
+                    # 站点可以正常响应，只是页面本身有问题，不计入熔断
+                    breaker.record_success()
+                    logger.error(f"fetch_page请求失败: {url} 错误信息： {e}")
+                    return None
+                breaker.record_failure()
+                if attempt == self.retry_policy.max_attempts:
+                    logger.error(f"fetch_page请求失败，已重试 {attempt} 次: {url} 错误信息： {e}")
+                    return None
+                if is_replaying():
+                    logger.warning(f"fetch_page请求失败，回放时不退避，第 {attempt + 1} 次尝试: {url} 错误信息： {e}")
+                    continue
+                delay = self.retry_policy.backoff(attempt)
+                logger.warning(f"fetch_page请求失败，{delay:.2f} 秒后第 {attempt + 1} 次尝试: {url} 错误信息： {e}")
+                get_metrics().inc("sleep_seconds", delay, source=self.source, reason="retry_backoff")
+                await asyncio.sleep(delay)
+        return None
+
+    async def fetch_page(self, url):
+        _start = time.perf_counter()
+        response = await self.fetch_with_retry(url)
+        elapsed = time.perf_counter() - _start
+        _page_fetch_seconds.set(_page_fetch_seconds.get() + elapsed)
+        metrics = get_metrics()
+        metrics.observe("article_fetch", elapsed, source=self.source)
+        if response is None:
             return None
+        metrics.inc("article_bytes", len(response.content), source=self.source)
+        return response.text
+
+    async def fetch_listing_page(self, url) -> tuple[CacheEntry | None, bool]:
+        """
+        获取列表页，优先使用磁盘缓存：新鲜期内直接复用，过期后发条件请求，304 时复用缓存内容。
+        :return: (缓存条目, 页面是否未变化)，请求失败时缓存条目为 None
+        """
+        metrics = get_metrics()
+        entry = self.page_cache.load(url)
+        # 录制/回放时每个列表页都要经过 http_get，不能跳过请求
+        if entry and current_archive() is None and entry.is_fresh(self.listing_cache_max_age):
+            logger.info(f"{self.source} {url} 缓存仍在有效期内，直接复用")
+            metrics.inc("listing_pages", source=self.source, result="fresh")
+            return entry, True
+        with metrics.timer("listing_fetch", source=self.source):
+            response = await self.fetch_with_retry(url, headers=entry.conditional_headers() if entry else None)
+        if response is None:
+            metrics.inc("listing_pages", source=self.source, result="failed")
+            return None, False
+        if entry and response.status_code == 304:
+            logger.info(f"{self.source} {url} 304 未修改，使用缓存")
+            metrics.inc("listing_pages", source=self.source, result="not_modified")
+            entry.fetched_at = time.time()
+            self.page_cache.save(entry, body_changed=False)
+            return entry, True
+        metrics.inc("listing_pages", source=self.source, result="changed")
+        metrics.inc("listing_bytes", len(response.content), source=self.source)
+        entry = CacheEntry(url=url, body=response.text, etag=response.headers.get("ETag"),
+                           last_modified=response.headers.get("Last-Modified"), fetched_at=time.time())
+        self.page_cache.save(entry)
+        return entry, False
+
+    async def collect_listing_links(self, today) -> dict[str, str]:
+        """
+        并发获取 origin_url() 中的所有列表页并提取链接，页面未变化时直接复用上次提取的链接。
+        :return: 去重后的 {链接（未拼接域名）: 锚文本}
+        """
+        visited_urls = {}
+        base_urls = self.origin_url()
+        logger.info(f"正在{self.source}并发爬取 {base_urls}")
+        fetched = await asyncio.gather(*[self.fetch_listing_page(url) for url in base_urls])
+        links_key = today or ""
+        for base_url, (entry, unchanged) in zip(base_urls, fetched):
+            if entry is None:
+                logger.info(f"无法获取初始{base_url}页面内容，切换。")
+                continue
+            # 旧版缓存只有链接列表、没有锚文本，需要重新提取
+            if unchanged and isinstance(entry.links.get(links_key), dict):
+                page_links = entry.links[links_key]
+                logger.info(f"{base_url} 页面未变化，复用已提取的 {len(page_links)} 个链接。")
+            else:
+                # 提取所有链接
+                page_links = self.extract_links(entry.body, set(), today)
+                entry.links = {links_key: page_links}
+                self.page_cache.save(entry, body_changed=False)
+            urls = page_links.keys() - visited_urls.keys()
+            for href, text in page_links.items():
+                if len(text) > len(visited_urls.get(href, "")) or href not in visited_urls:
+                    visited_urls[href] = text
+            logger.info(f"{base_url} 共发现 {len(urls)} 个链接。")
+        return visited_urls
 
 
 class ChinaDailyScraper(NewsScraper):
+    content_strainer = class_strainer("div", "Artical_Content")
+    listing_lang = "cn"
+    content_budget = 700
+    sentence_end = "。"
 
     def origin_url(self) -> list[str]:
         return [
@@ -166,48 +597,35 @@ class ChinaDailyScraper(NewsScraper):
             'https://world.chinadaily.com.cn/'
         ]
 
-    def truncate_by_pos(self, text: str, end_pos: 700) -> str:
-        if len(text) <= end_pos:
-            return text
-        last_period = text.find('。', end_pos)
-
-        if last_period != -1:
-            return text[:last_period + 1]
-        else:
-            return text
-
-    def extract_news_content(self, url) -> NewsArticle | None:
+    async def extract_news_content(self, url, today) -> NewsArticle | None:
         try:
 
             # 获取页面内容
-            html = self.fetch_page(url)
+            html = await self.fetch_page(url)
             if not html:
                 logger.warning(f'{url} not crawl anything', source={self.source})
                 return None
 
-            soup = BeautifulSoup(html, "html.parser")
+            # 只为正文容器建树，标题单独做一次局部解析
+            soup = parse_container(html, self.content_strainer, url)
 
             # 提取标题
-            title = soup.find("h1").get_text(strip=True) if soup.find("h1") else "无标题"
+            title = extract_title(html)
             # 提取正文图片
             image_urls = []
             article_div = soup.find("div", class_="Artical_Content")
             if article_div:
                 for img in article_div.select("img"):
-                    img_url = img.get("src")
-                    if img_url and not img_url.startswith("data:"):
-                        image_urls.append(urljoin(url, img_url))
+                    img_url = pick_image(img, url)
+                    if img_url:
+                        image_urls.append(img_url)
 
             # 提取正文文本
-            content = ""
-            for p in soup.select("p"):
-                text = p.get_text(strip=True)
-                if text and len(text) > 10:  # 过滤短文本
-                    content += text + " "
-            content = self.truncate_by_pos(content, 700)
+            content = self.extract_body(soup, url, today)
+            image_urls = limit_images(image_urls, content, cjk=True)
             article = NewsArticle(source=self.source, news_type=self.news_type, show=True)
             article.title = title
-            article.content_cn = content.strip()
+            article.content_cn = content
             article.url = url
             article.image_urls = image_urls
             article.images = [os.path.basename(i) for i in image_urls]
@@ -217,44 +635,40 @@ class ChinaDailyScraper(NewsScraper):
             logger.error(f"{url} {self.source} 提取新闻内容出错 : {e}", exc_info=True)
             return None
 
-    def extract_links(self, html, visited_urls, today) -> set[str]:
-        soup = BeautifulSoup(html, "html.parser")
+    def extract_links(self, html, visited_urls, today) -> dict[str, str]:
+        soup = make_soup(html, LINKS_ONLY)
         if today is None:
             today = datetime.now().strftime("%Y%m/%d")
         else:
             today = datetime.strptime(today, "%Y%m%d").strftime("%Y%m/%d")
-        urls = set()
+        urls = {}
         for a_tag in soup.find_all("a", href=True):
             href = a_tag["href"]
-            if today in href and href not in visited_urls:
+            if today in href and (href in urls or href not in visited_urls):
                 visited_urls.add(href)
-                urls.add(href)
+                add_link(urls, href, a_tag)
         return urls
 
-    def extract_unlisted_urls(self, today):
-        visited_urls = set()
-        full_urls = []
-        for base_url in self.origin_url():
-
-            html = self.fetch_page(base_url)
-            if not html:
-                logger.info("无法获取初始页面内容，程序退出。")
-                continue
-
-            # 提取所有链接
-            urls = self.extract_links(html, visited_urls, today)
-            logger.info(f"{base_url} 共发现 {len(urls)} 个链接。")
-
-        for url in visited_urls:
+    async def extract_unlisted_urls(self, today):
+        # 初始爬取目标页面
+        visited_urls = await self.collect_listing_links(today)
+        full_urls = {}
+        for url, text in visited_urls.items():
             if url.startswith("//"):
-                full_urls.append("https:" + url)
+                full_urls["https:" + url] = text
             else:
-                full_urls.append(url)
+                full_urls[url] = text
         logger.info(f"去重共发现 {len(visited_urls)} 个链接。")
         return full_urls
 
 
 class CNDailyENScraper(ChinaDailyScraper):
+    content_strainer = SoupStrainer("div", id="Content")
+    listing_lang = "en"
+    content_budget = 4000
+    sentence_end = "."
+    feed_urls = ('https://www.chinadaily.com.cn/rss/world_rss.xml',)
+
     def origin_url(self) -> list[str]:
         return [
             'https://www.chinadaily.com.cn',
@@ -262,47 +676,34 @@ class CNDailyENScraper(ChinaDailyScraper):
             'https://www.chinadaily.com.cn/business'
         ]
 
-    def truncate_by_pos(self, text: str, end_pos: 4000) -> str:
-        if len(text) <= end_pos:
-            return text
-        last_period = text.find('.', end_pos)
-
-        if last_period != -1:
-            return text[:last_period + 1]
-        else:
-            return text
-
-    def extract_news_content(self, url) -> NewsArticle | None:
+    async def extract_news_content(self, url, today) -> NewsArticle | None:
         try:
 
             # 获取页面内容
-            html = self.fetch_page(url)
+            html = await self.fetch_page(url)
             if not html:
                 return None
 
-            soup = BeautifulSoup(html, "html.parser")
+            # 只为正文容器建树，标题单独做一次局部解析
+            soup = parse_container(html, self.content_strainer, url)
 
             # 提取标题
-            title = soup.find("h1").get_text(strip=True) if soup.find("h1") else "无标题"
+            title = extract_title(html)
             # 提取正文图片
             image_urls = []
             article_div = soup.select_one("div#Content")
             if article_div:
                 for img in article_div.select("img"):
-                    img_url = img.get("src")
-                    if img_url and not img_url.startswith("data:"):
-                        image_urls.append(urljoin(url, img_url))
+                    img_url = pick_image(img, url)
+                    if img_url:
+                        image_urls.append(img_url)
 
             # 提取正文文本
-            content = ""
-            for p in soup.select("p"):
-                text = p.get_text(strip=True)
-                if text and len(text) > 10:  # 过滤短文本
-                    content += text + " "
-            content = self.truncate_by_pos(content, 4000)
+            content = self.extract_body(soup, url, today)
+            image_urls = limit_images(image_urls, content)
             article = NewsArticle(source=self.source, news_type=self.news_type, show=True)
             article.title_en = title
-            article.content_en = content.strip()
+            article.content_en = content
             article.url = url
             article.image_urls = image_urls
             article.images = [os.path.basename(i) for i in image_urls]
@@ -314,6 +715,10 @@ class CNDailyENScraper(ChinaDailyScraper):
 
 
 class BbcScraper(NewsScraper):
+    listing_cache_max_age = 1800
+    rate_limit = RateLimitConfig(rate=0.5, burst=3, max_rate=2.0)
+    content_strainer = SoupStrainer("article")
+    feed_urls = ('https://feeds.bbci.co.uk/news/rss.xml',)
 
     def origin_url(self) -> list[str]:
         return [
@@ -324,53 +729,36 @@ class BbcScraper(NewsScraper):
             'https://www.bbc.com'
         ]
 
-    def extract_news_content(self, url) -> NewsArticle | None:
+    async def extract_news_content(self, url, today) -> NewsArticle | None:
         try:
             # 获取页面内容
-            html = self.fetch_page(url)
+            html = await self.fetch_page(url)
             if not html:
                 return None
 
-            soup = BeautifulSoup(html, "html.parser")
+            # 只为正文容器建树，标题单独做一次局部解析
+            soup = parse_container(html, self.content_strainer, url)
 
             # 提取标题
-            title = soup.find("h1").get_text(strip=True) if soup.find("h1") else "无标题"
+            title = extract_title(html)
             image_urls = []
             article_div_list = soup.find_all("div", attrs={'data-component': 'image-block'})
             if article_div_list:
                 for article_div in article_div_list:
                     for img in article_div.select("img"):
-                        srcset = img.get("srcset")
-                        if not srcset:
-                            continue
-                        # 解析 srcset 并提取 (url, width) 元组
-                        entries = srcset.strip().split(',')
-                        image_data = []
-                        for entry in entries:
-                            entry = entry.strip()
-                            # 正则匹配：提取 URL 和宽度（例如："url.webp 1024w" 提取为 ("url.webp", 1024)）
-                            match = re.match(r'^(https?://[^ ]+) +(\d+)w$', entry)
-                            if match:
-                                img_url = match.group(1)
-                                width = int(match.group(2))
-                                image_data.append((img_url, width))
-                        # 找到宽度最大的条目
-                        if image_data:
-                            max_width_entry = max(image_data, key=lambda x: x[1])
-                            highest_res_url = max_width_entry[0]
-                            image_urls.append(highest_res_url)
+                        # 按显示区域选 srcset 中刚好够用的尺寸，而不是最大的
+                        img_url = pick_image(img, url)
+                        if img_url:
+                            image_urls.append(img_url)
                         else:
                             logger.warning("未找到有效图片 URL")
 
             # 提取正文文本
-            content = ""
-            for p in soup.select("p"):
-                text = p.get_text(strip=True)
-                if text and len(text) > 10:  # 过滤短文本
-                    content += text + " "
+            content = self.extract_body(soup, url, today)
+            image_urls = limit_images(image_urls, content)
             article = NewsArticle(source=self.source, news_type=self.news_type, show=True)
             article.title_en = title
-            article.content_en = content.strip()
+            article.content_en = content
             article.url = url
             article.image_urls = image_urls
             article.images = [os.path.basename(i).replace(".webp", "") for i in image_urls]
@@ -381,40 +769,36 @@ class BbcScraper(NewsScraper):
             logger.error(f" {self.source} 提取新闻内容出错 : {e}", exc_info=True)
             return None
 
-    def extract_links(self, html, visited_urls, today) -> set[str]:
-        """解析 HTML，提取所有链接"""
-        soup = BeautifulSoup(html, "html.parser")
-        urls = set()
+    def is_article_url(self, url: str) -> bool:
+        return '/articles/' in url
+
+    def extract_links(self, html, visited_urls, today) -> dict[str, str]:
+        """解析 HTML，提取所有链接及锚文本"""
+        soup = make_soup(html, LINKS_ONLY)
+        urls = {}
         for a_tag in soup.find_all("a", href=True):
             href = a_tag["href"]
-            if href not in visited_urls and '/live/' not in href and '/articles/' in href:
+            if self.is_article_url(href) and (href in urls or href not in visited_urls):
                 visited_urls.add(href)
-                urls.add(href)
+                add_link(urls, href, a_tag)
         return urls
 
-    def extract_unlisted_urls(self, today):
+    async def extract_unlisted_urls(self, today):
         # 初始爬取目标页面
-        visited_urls = set()
-        full_urls = []
-        for base_url in self.origin_url():
-            logger.info(f"正在{self.source}爬取 {base_url}")
-            html = self.fetch_page(base_url)
-            if not html:
-                logger.info(f"无法获取初始{base_url}页面内容，切换。")
-                continue
-
-            # 提取所有链接
-            urls = self.extract_links(html, visited_urls, today)
-            logger.info(f"{base_url} 共发现 {len(urls)} 个链接。")
-
-        for url in visited_urls:
+        visited_urls = await self.collect_listing_links(today)
+        full_urls = {}
+        for url, text in visited_urls.items():
             if "/articles" in url:
-                full_urls.append("https://www.bbc.com" + url)
+                full_urls["https://www.bbc.com" + url] = text
         logger.info(f" {self.source} 去重,拼接后共发现 {len(full_urls)} 个链接。")
         return full_urls
 
 
 class ALJScraper(NewsScraper):
+    listing_cache_max_age = 1800
+    rate_limit = RateLimitConfig(rate=0.5, burst=3, max_rate=2.0)
+    content_strainer = SoupStrainer("main", id="main-content-area")
+    feed_urls = ('https://www.aljazeera.com/xml/rss/all.xml',)
 
     def origin_url(self) -> list[str]:
         return [
@@ -423,17 +807,18 @@ class ALJScraper(NewsScraper):
             'https://www.aljazeera.com/asia-pacific/',
         ]
 
-    def extract_news_content(self, url) -> NewsArticle | None:
+    async def extract_news_content(self, url, today) -> NewsArticle | None:
         try:
             # 获取页面内容
-            html = self.fetch_page(url)
+            html = await self.fetch_page(url)
             if not html:
                 return None
 
-            soup = BeautifulSoup(html, "html.parser")
+            # 只为正文容器建树，标题单独做一次局部解析
+            soup = parse_container(html, self.content_strainer, url)
 
             # 提取标题
-            title = soup.find("h1").get_text(strip=True) if soup.find("h1") else "无标题"
+            title = extract_title(html)
             # 提取正文图片
             image_urls = []
             main = soup.find("main", attrs={'id': 'main-content-area'})
@@ -442,19 +827,16 @@ class ALJScraper(NewsScraper):
                     src_set = img.get("srcset")
                     if not src_set:
                         continue
-                    entries = src_set.strip().split(',')
-                    img_url = entries[-1].split(' ')[1]
-                    image_urls.append(urljoin(url, img_url))
+                    img_url = pick_srcset(src_set, url)
+                    if img_url:
+                        image_urls.append(img_url)
 
             # 提取正文文本
-            content = ""
-            for p in main.select("p"):
-                text = p.get_text(strip=True)
-                if text and len(text) > 10:  # 过滤短文本
-                    content += text + " "
+            content = self.extract_body(main, url, today)
+            image_urls = limit_images(image_urls, content)
             article = NewsArticle(source=self.source, news_type=self.news_type, show=True)
             article.title_en = title
-            article.content_en = content.strip()
+            article.content_en = content
             article.url = url
             article.image_urls = image_urls
             article.images = [os.path.basename(i).split('?')[0] for i in image_urls]
@@ -464,73 +846,33 @@ class ALJScraper(NewsScraper):
             logger.error(f" {self.source} 提取新闻内容出错 : {e}", exc_info=True)
             return None
 
-    def extract_links(self, html, visited_urls, today) -> set[str]:
-        soup = BeautifulSoup(html, "html.parser")
+    def extract_links(self, html, visited_urls, today) -> dict[str, str]:
+        soup = make_soup(html, LINKS_ONLY)
         if today is None:
             today = datetime.now().strftime("%Y%m/%d")
         else:
             today = datetime.strptime(today, "%Y%m%d").strftime("%Y/%-m/%-d")
-        urls = set()
+        urls = {}
         for a_tag in soup.find_all("a", href=True):
             href = a_tag["href"]
-            if today in href and href not in visited_urls:
+            if today in href and (href in urls or href not in visited_urls):
                 visited_urls.add(href)
-                urls.add(href)
+                add_link(urls, href, a_tag)
         return urls
 
-    def extract_unlisted_urls(self, today):
+    async def extract_unlisted_urls(self, today):
         # 初始爬取目标页面
-        visited_urls = set()
-        full_urls = []
-        for base_url in self.origin_url():
-            logger.info(f"正在{self.source}爬取 {base_url}")
-            html = self.fetch_page(base_url)
-            if not html:
-                logger.info(f"无法获取初始{base_url}页面内容，切换。")
-                continue
-
-            # 提取所有链接
-            urls = self.extract_links(html, visited_urls, today)
-            logger.info(f"{base_url} 共发现 {len(urls)} 个链接。")
-
-        for url in visited_urls:
-            if '/liveblog' not in url:
-                full_urls.append("https://www.aljazeera.com" + url)
+        visited_urls = await self.collect_listing_links(today)
+        full_urls = {}
+        for url, text in visited_urls.items():
+            full_urls["https://www.aljazeera.com" + url] = text
         logger.info(f" {self.source} 去重,拼接后共发现 {len(full_urls)} 个链接。")
         return full_urls
 
 
-def do_download_images(article, today_path):
-    folder = article.folder
-    img_folder_path = os.path.join(today_path, folder)
-    os.makedirs(img_folder_path, exist_ok=True)
-    cnt = 0
-    for image_name, image_url in zip(article.images, article.image_urls):
-        image_path = os.path.join(img_folder_path, image_name)
-        if not os.path.exists(image_path):
-            try:
-                ua = UserAgent()
-                ua_random = ua.random
-                headers = {"User-Agent": ua_random,
-                           "Accept-Language": "en-US,en;q=0.9", "DNT": "1",
-                           "Connection": "keep-alive",
-                           "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                           "Upgrade-Insecure-Requests": "1"
-                           }
-                response = requests.get(image_url, headers=headers, timeout=7, proxies=PROXY)
-                response.raise_for_status()
-                with open(image_path, "wb") as image_file:
-                    image_file.write(response.content)
-                cnt += 1
-            except requests.RequestException as e:
-                logger.error(f"下载图片失败: {image_url} - {e}")
-    images_done = cnt == len(article.images)
-    if not images_done:
-        logger.info(f'应该下载{len(article.images)}，实际下载了 {cnt} 张图片')
-    return images_done
-
-
 class RTScraper(NewsScraper):
+    content_strainer = class_strainer("div", "article")
+    feed_urls = ('https://www.rt.com/rss/news/',)
 
     def origin_url(self) -> list[str]:
         return [
@@ -538,34 +880,31 @@ class RTScraper(NewsScraper):
             'https://www.rt.com/news/'
         ]
 
-    def extract_news_content(self, url) -> NewsArticle | None:
+    async def extract_news_content(self, url, today) -> NewsArticle | None:
         try:
             # 获取页面内容
-            html = self.fetch_page(url)
+            html = await self.fetch_page(url)
             if not html:
                 return None
 
-            soup = BeautifulSoup(html, "html.parser")
+            # 只为正文容器建树，标题单独做一次局部解析
+            soup = parse_container(html, self.content_strainer, url)
 
             # 提取标题
-            title = soup.find("h1").get_text(strip=True) if soup.find("h1") else "无标题"
+            title = extract_title(html)
             # 提取正文图片
             image_urls = []
             main = soup.find("div", attrs={'class': 'article'})
             if main:
-                src_set = main.select('picture')[0].select('source')[1].get('data-srcset').split(',')[-1]
-                if src_set:
-                    strip = src_set.strip()
-                    image_urls.append(urljoin(url, strip.split(' ')[0]))
+                img_url = pick_image(main.select('picture')[0].select('source')[1], url)
+                if img_url:
+                    image_urls.append(img_url)
             # 提取正文文本
-            content = ""
-            for p in main.select("p"):
-                text = p.get_text(strip=True)
-                if text and len(text) > 10:  # 过滤短文本
-                    content += text + " "
+            content = self.extract_body(main, url, today)
+            image_urls = limit_images(image_urls, content)
             article = NewsArticle(source=self.source, news_type=self.news_type, show=True)
             article.title_en = title
-            article.content_en = content.strip()
+            article.content_en = content
             article.url = url
             article.image_urls = image_urls
             article.images = [os.path.basename(i).split('?')[0] for i in image_urls]
@@ -575,36 +914,28 @@ class RTScraper(NewsScraper):
             logger.error(f" {self.source} 提取新闻{url}内容出错 : {e}", exc_info=True)
             return None
 
-    def extract_links(self, html, visited_urls, today) -> set[str]:
-        soup = BeautifulSoup(html, "html.parser")
-        urls = set()
+    def is_article_url(self, url: str) -> bool:
+        return '/news/' in url or '/russia/' in url
+
+    def extract_links(self, html, visited_urls, today) -> dict[str, str]:
+        soup = make_soup(html, LINKS_ONLY)
+        urls = {}
         for a_tag in soup.find_all("a", href=True):
             href = a_tag["href"]
-            if href not in visited_urls and ('/news/' in href or '/russia/' in href):
+            if self.is_article_url(href) and (href in urls or href not in visited_urls):
                 visited_urls.add(href)
-                urls.add(href)
+                add_link(urls, href, a_tag)
         return urls
 
-    def extract_unlisted_urls(self, today):
+    async def extract_unlisted_urls(self, today):
         # 初始爬取目标页面
-        visited_urls = set()
-        full_urls = []
-        for base_url in self.origin_url():
-            logger.info(f"正在{self.source}爬取 {base_url}")
-            html = self.fetch_page(base_url)
-            if not html:
-                logger.info(f"无法获取初始{base_url}页面内容，切换。")
-                continue
-
-            # 提取所有链接
-            urls = self.extract_links(html, visited_urls, today)
-            logger.info(f"{base_url} 共发现 {len(urls)} 个链接。")
-
-        for url in visited_urls:
+        visited_urls = await self.collect_listing_links(today)
+        full_urls = {}
+        for url, text in visited_urls.items():
             if 'http' in url:
-                full_urls.append(url)
+                full_urls[url] = text
             else:
-                full_urls.append("https://www.rt.com" + url)
+                full_urls["https://www.rt.com" + url] = text
         logger.info(f" {self.source} 去重,拼接后共发现 {len(full_urls)} 个链接。")
         return full_urls
 
@@ -645,36 +976,41 @@ def check_news_content_social_influence(text):
     return score < 1
 
 
-def load_and_summarize_news(json_file_path: str) -> List[NewsArticle]:
+def load_and_summarize_news(json_file_path: str, ollama_client: OllamaClient = None) -> List[NewsArticle]:
     """
     加载新闻数据，提取中文摘要，并翻译英文内容为中文。
+    所有文章的标题翻译和摘要请求一次性提交，由客户端按并发上限同时发给模型。
     :param json_file_path: JSON 文件路径
+    :param ollama_client: 多个新闻源共用的客户端，为 None 时新建一个，用完关闭
     :return: 包含摘要和翻译后内容的 NewsArticle 列表
     """
-
-    # 初始化 Ollama 客户端
-    ollama_client = OllamaClient()
+    if ollama_client is None:
+        with OllamaClient() as own_client:
+            return load_and_summarize_news(json_file_path, own_client)
 
     # 加载 JSON 文件
     with open(json_file_path, 'r', encoding='utf-8') as json_file:
         news_data = json.load(json_file)
+    articles = [NewsArticle(**news_item) for news_item in news_data]
+
+    # 英文内容优先生成摘要，没有英文内容时用中文内容
+    title_articles = [article for article in articles if article.title_en]
+    en_articles = [article for article in articles if article.content_en]
+    cn_articles = [article for article in articles if article.content_cn and not article.content_en]
+    title_futures = ollama_client.submit_batch(ollama_client.translate_to_chinese,
+                                               [article.title_en for article in title_articles])
+    en_futures = ollama_client.submit_batch(ollama_client.generate_summary_cn,
+                                            [article.content_en for article in en_articles], max_tokens=120)
+    cn_futures = ollama_client.submit_batch(ollama_client.generate_summary,
+                                            [article.content_cn for article in cn_articles], max_tokens=120)
+    for article, future in zip(title_articles, title_futures):
+        article.title = future.result()
+    for article, future in zip(en_articles + cn_articles, en_futures + cn_futures):
+        article.summary = future.result()
 
     # 处理每条新闻
     processed_news = []
-    for news_item in news_data:
-        article = NewsArticle(**news_item)
-
-        if article.title_en:
-            article.title = ollama_client.translate_to_chinese(text=article.title_en)
-        # if article.title and not article.title_en:
-        #     article.title_en = ollama_client.translate_to_english(text=article.title)
-
-        # 提取中文摘要
-        if article.content_cn:
-            article.summary = ollama_client.generate_summary(article.content_cn, max_tokens=120)
-        if article.content_en:
-            article.summary = ollama_client.generate_summary_cn(article.content_en, max_tokens=120)
-        # article.summary = ollama_client.optimize_summary_cn(article.summary, max_tokens=120)
+    for article in articles:
         logger.info(f'summary is {article.summary} ,len = {len(article.summary)}')
         if check_english_percentage(article.summary):
             article.show = False
@@ -700,10 +1036,12 @@ def load_json_by_source(source, today):
     return json_file_path, news_data
 
 
-def process_news_results(source: str, today: str = datetime.now().strftime("%Y%m%d")) -> List[NewsArticle]:
+def process_news_results(source: str, today: str = datetime.now().strftime("%Y%m%d"),
+                         ollama_client: OllamaClient = None) -> List[NewsArticle]:
     """
     处理指定日期的新闻结果文件，提取摘要并翻译内容。
     :param today: 日期字符串，格式为 YYYYMMDD
+    :param ollama_client: 多个新闻源共用的客户端
     """
     logger.info(f"开始处理 {source} 的新闻结果文件...")
     folder_path = os.path.join(NEWS_FOLDER_NAME, today, source)
@@ -714,7 +1052,7 @@ def process_news_results(source: str, today: str = datetime.now().strftime("%Y%m
             logger.info(f"{processed_json_path}已存在处理后的新闻结果文件，跳过处理,直接返回")
             _, data = load_json_by_source(source, today)
             return [NewsArticle(**i) for i in data]
-        processed_news = load_and_summarize_news(json_file_path)
+        processed_news = load_and_summarize_news(json_file_path, ollama_client)
 
         with open(processed_json_path, 'w', encoding='utf-8') as json_file:
             json.dump([article.to_dict() for article in processed_news], json_file, ensure_ascii=False, indent=4)
@@ -746,50 +1084,97 @@ def generate_all_news_audio(source: str, today: str = datetime.now().strftime("%
         generate_audio(text=article.summary, output_file=audio_output_path, time_tag=article.times)
 
 
-import time
-from threading import Thread
+async def crawl_all_sources(scrapers: list[NewsScraper], today: str) -> list[NewsArticle]:
+    """
+    在同一个事件循环中并发爬取所有新闻源，单个新闻源失败不影响其它新闻源。
+    :return: 所有新闻源爬取到的 NewsArticle 列表
+    """
+    # 阻塞的 requests 调用都在该线程池中执行，容量按各新闻源的并发上限之和配置
+    workers = max(CRAWL_IO_WORKERS, sum(s.max_concurrency for s in scrapers))
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=workers))
+    results = []
+    with ImageDownloader() as image_downloader:
+        for scraper in scrapers:
+            scraper.image_downloader = image_downloader
+        outcomes = await asyncio.gather(*[s.do_crawl_news(today) for s in scrapers], return_exceptions=True)
+    for scraper, outcome in zip(scrapers, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"{scraper.source} 爬取异常: {outcome}", exc_info=outcome)
+            continue
+        results.extend(outcome)
+    return results
+
+
+def prepare_replay(today: str, time_tag: int) -> dict[str, str]:
+    """
+    回放不读写真实数据：文章输出、列表页缓存和图片仓库放在本次回放独立的目录中，
+    已访问记录、模板段落统计和新闻指纹使用内存库，保证每次回放爬取的文章一致。
+    :return: 传给爬虫的 news_folder / cache_folder
+    """
+    replay_folder = build_replay_folder(today, time_tag)
+    logger.info(f"回放输出目录: {replay_folder}")
+    set_visited_url_store(VisitedUrlStore(":memory:"))
+    set_boilerplate_store(BoilerplateStore(":memory:"))
+    set_near_duplicate_index(NearDuplicateIndex(":memory:"))
+    set_image_store(ImageStore(os.path.join(replay_folder, "blobs")))
+    return {"news_folder": os.path.join(replay_folder, NEWS_FOLDER_NAME),
+            "cache_folder": os.path.join(replay_folder, HTTP_CACHE_FOLDER_NAME)}
 
 
-def auto_download_daily(today=datetime.now().strftime("%Y%m%d"), time_tag: int = 0):
+def auto_download_daily(today=datetime.now().strftime("%Y%m%d"), time_tag: int = 0, archive_mode: str = None):
+    """
+    :param archive_mode: None 表示正常爬取；record 录制本期所有 HTTP 响应；
+                         replay / replay-fast 从录制的归档离线回放（按录制耗时 / 零延迟）
+    """
     logger.info("开始爬取新闻")
     _start = time.time()
-    rt = RTScraper(source_url='https://www.rt.com/', source=RT, news_type='今日俄罗斯', sleep_time=4, times=time_tag)
-    al = ALJScraper(source_url='https://www.aljazeera.com/', source=ALJ, news_type='中东半岛新闻', sleep_time=20,
-                    times=time_tag)
-    bbc = BbcScraper(source_url='https://www.bbc.com', source=BBC, news_type='BBC', sleep_time=20, times=time_tag)
+    metrics = reset_metrics()
+    replaying = archive_mode in (REPLAY, REPLAY_FAST)
+    if archive_mode:
+        open_archive(today, time_tag, archive_mode)
+    folders = prepare_replay(today, time_tag) if replaying else {}
+    rt = RTScraper(source_url='https://www.rt.com/', source=RT, news_type='今日俄罗斯', times=time_tag, **folders)
+    al = ALJScraper(source_url='https://www.aljazeera.com/', source=ALJ, news_type='中东半岛新闻',
+                    times=time_tag, max_concurrency=2, **folders)
+    bbc = BbcScraper(source_url='https://www.bbc.com', source=BBC, news_type='BBC', times=time_tag,
+                     max_concurrency=2, **folders)
     cn = CNDailyENScraper(source_url='https://www.chinadaily.com.cn', source=CHINADAILY_EN, news_type='中国日报',
-                          sleep_time=4, times=time_tag)
-
-    threads = []
-    results = []
-    for scraper in [rt, al, bbc, cn]:
-        thread = Thread(target=lambda q, arg1, s=scraper: q.extend(s.do_crawl_news(arg1)), args=(results, today))
-        threads.append(thread)
-        thread.start()
-    for thread in threads:
-        thread.join()
+                          times=time_tag, **folders)
+
+    try:
+        results = asyncio.run(crawl_all_sources([rt, al, bbc, cn], today))
+    finally:
+        close_sessions()
+        close_archive()
+        # 回放的指标单独存放，不覆盖真实爬取的指标
+        metrics.write(today, time_tag, suffix=f"_{archive_mode}" if archive_mode else "")
     _end = time.time()
     info = f"{today},{time_tag},并发爬取新闻耗时: {_end - _start:.2f} 秒,获取到 {len(results)} 个新闻"
     logger.info(info)
+    if replaying:
+        return
     send_to_dingtalk(info,False)
-    urls = []
-    [urls.append(i.url) for i in results]
-    append_and_save_month_urls(today[:6], set(urls))
+    visited_store = get_visited_url_store()
+    visited_store.add_many([i.url for i in results], today)
+    visited_store.prune(today)
+    get_boilerplate_store().prune(today)
+    get_near_duplicate_index().prune(today)
 
 
 def add_summary_audio(time_tag, today):
-    rt = RTScraper(source_url='https://www.rt.com/', source=RT, news_type='今日俄罗斯', sleep_time=4, times=time_tag)
-    al = ALJScraper(source_url='https://www.aljazeera.com/', source=ALJ, news_type='中东半岛新闻', sleep_time=20,
+    rt = RTScraper(source_url='https://www.rt.com/', source=RT, news_type='今日俄罗斯', times=time_tag)
+    al = ALJScraper(source_url='https://www.aljazeera.com/', source=ALJ, news_type='中东半岛新闻',
                     times=time_tag)
-    bbc = BbcScraper(source_url='https://www.bbc.com', source=BBC, news_type='BBC', sleep_time=20, times=time_tag)
+    bbc = BbcScraper(source_url='https://www.bbc.com', source=BBC, news_type='BBC', times=time_tag)
     en = CNDailyENScraper(source_url='https://www.chinadaily.com.cn', source=CHINADAILY_EN, news_type='中国日报',
-                          sleep_time=4, times=time_tag)
+                          times=time_tag)
     logger.info("开始AI生成摘要")
     _start = time.time()
-    rt_articles = process_news_results(source=rt.source, today=today)
-    bbc_articles = process_news_results(source=bbc.source, today=today)
-    en_articles = process_news_results(source=en.source, today=today)
-    al_articles = process_news_results(source=al.source, today=today)
+    # 四个新闻源同时处理，共用一个客户端的连接和并发名额，模型的并行槽位始终排满
+    with OllamaClient() as ollama_client, ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(process_news_results, source=s.source, today=today, ollama_client=ollama_client)
+                   for s in (rt, bbc, en, al)]
+        rt_articles, bbc_articles, en_articles, al_articles = [f.result() for f in futures]
     _end = time.time()
     logger.info(f"AI生成摘要耗时: {_end - _start:.2f} 秒")
     build_new_articles_json(today, rt_articles, al_articles, bbc_articles, en_articles, time_tag)
@@ -849,9 +1234,8 @@ def get_today_morning_urls(today=datetime.now().strftime("%Y%m%d")):
 
 
 def _test_alj():
-    cs = RTScraper(source_url='https://www.rt.com/', source=RT, news_type='国际新闻',
-                   sleep_time=0)
-    cs.do_crawl_news(today="20250601")
+    cs = RTScraper(source_url='https://www.rt.com/', source=RT, news_type='国际新闻')
+    asyncio.run(cs.do_crawl_news(today="20250601"))
 
     logger.info("============")
 
@@ -864,13 +1248,15 @@ if __name__ == "__main__":
     parser.add_argument("--times", type=int, default=0, help="执行次数")
     parser.add_argument("--rewrite", type=bool, default=False, help="是否重写")
     parser.add_argument("--func", type=str, default='crawl', help="默认爬取")
+    parser.add_argument("--archive", type=str, default=None, choices=ARCHIVE_MODES,
+                        help="record 录制本期 HTTP 响应，replay / replay-fast 离线回放")
     args = parser.parse_args()
     _start = time.time()
     if args.func == 'crawl':
         logger.info('========start crawl==============')
         logger.info(f"新闻爬取调用参数 args={args}")
         try:
-            auto_download_daily(today=args.today, time_tag=args.times)
+            auto_download_daily(today=args.today, time_tag=args.times, archive_mode=args.archive)
         except  Exception as e:
             logger.error(f"auto_download_daily error:{e}", exc_info=True)
             info = f"{args.today},{args.times} 并发爬取新闻异常，Exception type: {type(e)},Exception args: {e.args},Exception message: {str(e)}"
@@ -904,4 +1290,5 @@ if __name__ == "__main__":
 
 
         remove_outdated_documents()
+        get_image_store().gc()
         logger.info(f"========end combine_videos time spend = {time.time() - _start:.2f} second=========")
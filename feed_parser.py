@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from xml.etree import ElementTree
+
+# 条目节点：RSS 2.0 的 item、Atom 的 entry、sitemap 的 url
+ITEM_TAGS = ("item", "entry", "url")
+# 按优先级排列的发布时间字段（RSS、Atom、Google News sitemap、Dublin Core）
+DATE_TAGS = ("pubDate", "published", "publication_date", "updated", "date", "lastmod")
+
+
+@dataclass
+class FeedItem:
+    url: str
+    title: str = ""
+    published: datetime = None
+
+    def published_on(self, day: str) -> bool:
+        """
+        发布时间换算到本地时区后是否在 day 当天，没有发布时间的条目视为当天。
+        :param day: YYYYMMDD
+        """
+        if self.published is None:
+            return True
+        return self.published.astimezone().strftime("%Y%m%d") == day
+
+
+def _local_name(tag) -> str:
+    # 去掉命名空间，{http://www.w3.org/2005/Atom}entry -> entry
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _parse_date(text: str) -> datetime | None:
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        return parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _parse_item(item) -> FeedItem | None:
+    url, title, dates = None, "", {}
+    for child in item.iter():
+        name = _local_name(child.tag)
+        text = (child.text or "").strip()
+        if name == "link" and url is None:
+            # Atom 的链接在 href 属性中，rel 缺省即 alternate
+            if child.get("href") and child.get("rel", "alternate") == "alternate":
+                url = child.get("href").strip()
+            elif text:
+                url = text
+        elif name == "loc" and url is None:
+            url = text
+        elif name == "title" and not title:
+            title = text
+        elif name in DATE_TAGS and name not in dates:
+            dates[name] = text
+    if not url:
+        return None
+    published = next((d for d in (_parse_date(dates.get(tag)) for tag in DATE_TAGS) if d), None)
+    return FeedItem(url=url, title=title, published=published)
+
+
+def parse_feed(xml_text: str) -> list[FeedItem]:
+    """
+    解析 RSS 2.0、Atom 与 news sitemap，统一返回 FeedItem 列表，保持 feed 中的顺序。
+    :raise ElementTree.ParseError: 内容不是合法的 XML
+    """
+    root = ElementTree.fromstring(xml_text)
+    items = []
+    for elem in root.iter():
+        if _local_name(elem.tag) in ITEM_TAGS:
+            item = _parse_item(elem)
+            if item:
+                items.append(item)
+    return items
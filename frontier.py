@@ -0,0 +1,68 @@
+import heapq
+import itertools
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+# url 中的日期：202506/01（中国日报）、2025/6/1（半岛）、2025-06-01
+_URL_DATE = re.compile(r"(?<!\d)(20\d{2})[/-]?(\d{1,2})[/-](\d{1,2})(?!\d)")
+# 视频、图集、测验等没有可用正文的页面
+LOW_VALUE_WORDS = re.compile(r"\b(video|watch|podcast|quiz|in pictures|gallery|listen)\b|视频|图集|直播",
+                             re.IGNORECASE)
+
+
+def url_date(url: str) -> datetime | None:
+    match = _URL_DATE.search(url)
+    if not match:
+        return None
+    try:
+        return datetime(*(int(g) for g in match.groups()))
+    except ValueError:
+        return None
+
+
+def score_link(url: str, text: str, rank: int, total: int, today: str = None) -> float:
+    """
+    链接优先级，越大越先抓取：
+    - 在列表页（按 origin_url 顺序）或 feed 中越靠前越重要，取值 0~1；
+    - url 中的日期是当天 +1，早于前一天 -1；
+    - 锚文本像标题（长度适中）+0.5，没有锚文本 -0.5，视频、图集等 -1。
+    """
+    score = 1.0 - rank / max(total, 1)
+    day = url_date(url)
+    if day:
+        age = ((datetime.strptime(today, "%Y%m%d") if today else datetime.now()) - day).days
+        score += 1.0 if age <= 0 else (0.0 if age == 1 else -1.0)
+    if not text:
+        score -= 0.5
+    elif 10 <= len(text) <= 150:
+        score += 0.5
+    if LOW_VALUE_WORDS.search(text or "") or LOW_VALUE_WORDS.search(url):
+        score -= 1.0
+    return score
+
+
+@dataclass
+class FrontierItem:
+    priority: float
+    url: str
+    text: str = ""
+
+
+class UrlFrontier:
+    """
+    单个新闻源待抓取链接的优先队列，优先级相同时保持加入顺序。
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, FrontierItem]] = []
+        self._seq = itertools.count()
+
+    def push(self, url: str, text: str, priority: float):
+        heapq.heappush(self._heap, (-priority, next(self._seq), FrontierItem(priority=priority, url=url, text=text)))
+
+    def pop(self) -> FrontierItem:
+        return heapq.heappop(self._heap)[2]
+
+    def __len__(self) -> int:
+        return len(self._heap)
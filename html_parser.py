@@ -0,0 +1,105 @@
+import re
+from dataclasses import dataclass
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from logging_config import logger
+from utils import HTML_PARSER
+
+try:
+    import lxml  # noqa: F401
+
+    _LXML_AVAILABLE = True
+except ImportError:
+    _LXML_AVAILABLE = False
+
+# 列表页只需要 <a href>，其它节点不建树
+LINKS_ONLY = SoupStrainer("a", href=True)
+TITLE_ONLY = SoupStrainer("h1")
+
+
+def class_strainer(name: str, css_class: str) -> SoupStrainer:
+    """
+    按 class 局部解析。解析阶段拿到的是原始 class 字符串（可能包含多个 class），
+    这里用正则按单词匹配，效果与 soup.find(name, class_=css_class) 一致。
+    """
+    return SoupStrainer(name, class_=re.compile(rf"(^|\s){re.escape(css_class)}(\s|$)"))
+
+
+def parser_backend() -> str:
+    """配置为 lxml 但未安装时退回标准库解析器"""
+    if HTML_PARSER == "lxml" and not _LXML_AVAILABLE:
+        return "html.parser"
+    return HTML_PARSER
+
+
+def make_soup(html: str, parse_only: SoupStrainer = None) -> BeautifulSoup:
+    return BeautifulSoup(html, parser_backend(), parse_only=parse_only)
+
+
+def extract_title(html: str, default: str = "无标题") -> str:
+    h1 = make_soup(html, TITLE_ONLY).find("h1")
+    return h1.get_text(strip=True) if h1 else default
+
+
+def anchor_text(a_tag) -> str:
+    """链接的可见文字；纯图片链接退回 title / aria-label 属性"""
+    text = a_tag.get_text(" ", strip=True)
+    return text or a_tag.get("title", "").strip() or a_tag.get("aria-label", "").strip()
+
+
+def add_link(links: dict[str, str], href: str, a_tag) -> None:
+    """
+    记录 href 及其锚文本。同一篇文章在列表页常出现多次（图片、标题、摘要各一个链接），
+    保留最长的一段，通常就是标题。
+    """
+    text = anchor_text(a_tag)
+    if len(text) > len(links.get(href, "")) or href not in links:
+        links[href] = text
+
+
+def parse_container(html: str, strainer: SoupStrainer, url: str = None) -> BeautifulSoup:
+    """
+    只为正文容器建树；页面结构变化导致容器不存在时，退回整页解析，保持原有提取逻辑可用。
+    """
+    soup = make_soup(html, strainer)
+    if soup.find():
+        return soup
+    logger.warning(f"{url} 未找到正文容器，退回整页解析")
+    return make_soup(html)
+
+
+@dataclass
+class ExtractedText:
+    text: str
+    # 按预算截断时，截断处所在段落丢弃的字数，以及之后没有读取的段落数
+    dropped_chars: int = 0
+    dropped_paragraphs: int = 0
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped_chars > 0 or self.dropped_paragraphs > 0
+
+
+def extract_paragraphs(paragraphs, budget: int = None, sentence_end: str = "。", min_length: int = 10) -> ExtractedText:
+    """
+    拼接段落文本（段落之间用空格分隔），只保留长度超过 min_length 的段落。
+    总长度超过 budget 后，在 budget 之后的第一个 sentence_end 处截断，不再读取后面的段落；
+    budget 之后一直没有句末标点时保留全文。
+    :param paragraphs: <p> 节点或段落文本列表
+    """
+    parts = []
+    length = 0
+    for idx, p in enumerate(paragraphs):
+        text = p if isinstance(p, str) else p.get_text(strip=True)
+        if not text or len(text) <= min_length:
+            continue
+        if budget is not None and length + len(text) > budget:
+            pos = text.find(sentence_end, max(0, budget - length))
+            if pos != -1:
+                parts.append(text[:pos + 1])
+                return ExtractedText(" ".join(parts), dropped_chars=len(text) - pos - 1,
+                                     dropped_paragraphs=len(paragraphs) - idx - 1)
+        parts.append(text)
+        length += len(text) + 1
+    return ExtractedText(" ".join(parts))
@@ -0,0 +1,116 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from logging_config import logger
+from utils import HTTP_ARCHIVE_FOLDER_NAME
+
+RECORD = "record"
+# 按录制时的耗时回放
+REPLAY = "replay"
+# 零延迟回放
+REPLAY_FAST = "replay-fast"
+ARCHIVE_MODES = (RECORD, REPLAY, REPLAY_FAST)
+
+_archive = None
+
+
+class HttpArchive:
+    """
+    一期节目的 HTTP 录制/回放归档（SQLite，响应体 zlib 压缩，按 url 索引）。
+    录制模式下 http_get 的每个响应都写入归档；回放模式下直接从归档构造响应，不访问网络。
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in ARCHIVE_MODES:
+            raise ValueError(f"不支持的归档模式: {mode}")
+        if mode != RECORD and not os.path.exists(path):
+            raise FileNotFoundError(f"回放归档不存在: {path}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS responses ("
+                           "url TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, "
+                           "body BLOB NOT NULL, latency REAL NOT NULL, recorded_at REAL NOT NULL)")
+        self._conn.commit()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    def record(self, url: str, response: requests.Response, latency: float):
+        body = zlib.compress(response.content)
+        headers = json.dumps(dict(response.headers), ensure_ascii=False)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                               (url, response.status_code, headers, body, latency, time.time()))
+            self._conn.commit()
+
+    def replay(self, url: str) -> requests.Response:
+        with self._lock:
+            row = self._conn.execute("SELECT status, headers, body, latency FROM responses WHERE url = ?",
+                                     (url,)).fetchone()
+        if row is None:
+            raise requests.ConnectionError(f"归档中没有该请求: {url}")
+        status, headers, body, latency = row
+        if self.mode == REPLAY and latency > 0:
+            time.sleep(latency)
+        response = requests.Response()
+        response.url = url
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        # 已解压的内容不能再按 Content-Encoding 解码
+        response.headers.pop("Content-Encoding", None)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = zlib.decompress(body)
+        response._content_consumed = True
+        return response
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def build_archive_path(today: str, time_tag: int) -> str:
+    return os.path.join(HTTP_ARCHIVE_FOLDER_NAME, f"{today}_{time_tag}.db")
+
+
+def build_replay_folder(today: str, time_tag: int) -> str:
+    """每次回放新建一个独立的输出目录，保留下来便于对比，不会覆盖真实爬取的结果"""
+    folder = os.path.join(HTTP_ARCHIVE_FOLDER_NAME, "replay")
+    os.makedirs(folder, exist_ok=True)
+    return tempfile.mkdtemp(prefix=f"{today}_{time_tag}_", dir=folder)
+
+
+def open_archive(today: str, time_tag: int, mode: str) -> HttpArchive:
+    global _archive
+    _archive = HttpArchive(build_archive_path(today, time_tag), mode)
+    logger.info(f"HTTP 归档已开启 mode={mode} path={_archive.path}")
+    return _archive
+
+
+def close_archive():
+    global _archive
+    if _archive is not None:
+        _archive.close()
+        logger.info(f"HTTP 归档已关闭 path={_archive.path}")
+        _archive = None
+
+
+def current_archive() -> HttpArchive | None:
+    return _archive
+
+
+def is_replaying() -> bool:
+    """回放时响应来自归档，不需要限速、退避，也不应把回放的耗时反馈给限速器"""
+    return _archive is not None and not _archive.recording
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from logging_config import logger
+from utils import HTTP_CACHE_FOLDER_NAME
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: str
+    etag: str = None
+    last_modified: str = None
+    fetched_at: float = 0.0
+    # 按 today 记录该页面已提取出的链接及锚文本，页面未变化时可以跳过 extract_links
+    links: dict[str, dict[str, str]] = field(default_factory=dict)
+
+    def is_fresh(self, max_age: int) -> bool:
+        return max_age > 0 and time.time() - self.fetched_at < max_age
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    列表页的磁盘缓存：保存 ETag/Last-Modified 与页面内容，用于条件请求。
+    每个 url 对应 {sha1}.json（元数据与链接）和 {sha1}.html（页面内容）两个文件。
+    """
+
+    def __init__(self, folder: str = HTTP_CACHE_FOLDER_NAME):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.folder, key + suffix)
+
+    def load(self, url: str) -> CacheEntry | None:
+        meta_path, body_path = self._path(url, ".json"), self._path(url, ".html")
+        if not os.path.exists(meta_path) or not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            with open(body_path, "r", encoding="utf-8") as body_file:
+                body = body_file.read()
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取页面缓存失败: {url} {e}")
+            return None
+        return CacheEntry(body=body, **meta)
+
+    def save(self, entry: CacheEntry, body_changed: bool = True):
+        meta = {"url": entry.url, "etag": entry.etag, "last_modified": entry.last_modified,
+                "fetched_at": entry.fetched_at, "links": entry.links}
+        if body_changed:
+            _atomic_write(self._path(entry.url, ".html"), entry.body)
+        _atomic_write(self._path(entry.url, ".json"), json.dumps(meta, ensure_ascii=False))
+
+
+def _atomic_write(path: str, text: str):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,109 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from fake_useragent import UserAgent
+
+from http_archive import current_archive, is_replaying
+from logging_config import logger
+from utils import PROXY, HTTP_POOL_SIZE, USER_AGENT_POOL_SIZE
+
+try:
+    # requests 只有在安装了 brotli 时才能解码 br 响应
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+PAGE_ACCEPT = "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"
+IMAGE_ACCEPT = "image/avif,image/webp,image/apng,image/*,*/*;q=0.8"
+FALLBACK_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                       "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36")
+
+_lock = threading.RLock()
+_sessions: dict[str, requests.Session] = {}
+_user_agents: list[str] = []
+
+
+def load_user_agents(size: int = USER_AGENT_POOL_SIZE) -> list[str]:
+    """
+    进程内只加载一次 fake_useragent 数据库，预先生成 size 个 User-Agent 供所有爬虫和图片下载共用。
+    """
+    with _lock:
+        if _user_agents:
+            return _user_agents
+        try:
+            ua = UserAgent()
+            agents = {ua.random for _ in range(size)}
+        except Exception as e:
+            logger.error(f"加载 User-Agent 数据库失败，使用默认 User-Agent: {e}")
+            agents = set()
+        _user_agents.extend(sorted(agents) or [FALLBACK_USER_AGENT])
+        logger.info(f"User-Agent 池加载完成，共 {len(_user_agents)} 个")
+        return _user_agents
+
+
+def random_user_agent() -> str:
+    return random.choice(load_user_agents())
+
+
+def build_headers(accept: str = PAGE_ACCEPT) -> dict[str, str]:
+    return {"User-Agent": random_user_agent(),
+            "Accept-Language": "en-US,en;q=0.9", "DNT": "1",
+            "Connection": "keep-alive",
+            "Accept": accept,
+            "Accept-Encoding": ACCEPT_ENCODING,
+            "Upgrade-Insecure-Requests": "1"
+            }
+
+
+def get_session(url: str, pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    按域名复用 keep-alive 连接池，同一域名的页面和图片请求只需握手一次。
+    """
+    domain = urlsplit(url).netloc
+    session = _sessions.get(domain)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(domain)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if PROXY:
+                session.proxies.update(PROXY)
+            _sessions[domain] = session
+            logger.info(f"创建 {domain} 连接池，pool_size={pool_size}")
+        return session
+
+
+def http_get(url: str, timeout: float, accept: str = PAGE_ACCEPT, headers: dict[str, str] = None,
+             **kwargs) -> requests.Response:
+    archive = current_archive()
+    if is_replaying():
+        return archive.replay(url)
+    request_headers = build_headers(accept)
+    if headers:
+        request_headers.update(headers)
+    if archive is not None:
+        # 录制时不发条件请求，保证归档中是完整的响应内容
+        request_headers.pop("If-None-Match", None)
+        request_headers.pop("If-Modified-Since", None)
+    _start = time.time()
+    response = get_session(url).get(url, headers=request_headers, timeout=timeout, **kwargs)
+    if archive is not None:
+        archive.record(url, response, time.time() - _start)
+    return response
+
+
+def close_sessions():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,206 @@
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+
+from http_archive import is_replaying
+from http_client import http_get, IMAGE_ACCEPT
+from image_store import ImageStore, get_image_store, file_digest
+from image_normalizer import ImageRejected, normalize_image, normalized_image_name
+from crawl_metrics import get_metrics
+from circuit_breaker import RETRYABLE_STATUS, RetryPolicy, get_circuit_breaker
+from rate_limiter import RateLimitConfig, get_rate_limiter
+from logging_config import logger
+from utils import IMAGE_MAX_BYTES, IMAGE_CHUNK_SIZE, IMAGE_DOWNLOAD_WORKERS, IMAGE_DOWNLOAD_TIMEOUT
+
+# 部分 CDN 不返回 image/*，按二进制流下发图片
+ALLOWED_CONTENT_TYPES = ("image/", "application/octet-stream", "binary/octet-stream")
+
+
+@dataclass
+class ImageDownloadResult:
+    url: str
+    path: str
+    ok: bool
+    size: int = 0
+    elapsed: float = 0.0
+    error: str = None
+    # 图片能下载但损坏或尺寸过小，被入库校验拒绝
+    rejected: bool = False
+    # 已存在或图片仓库命中，没有发请求
+    cached: bool = False
+    # 实际发出的请求次数，大于 1 表示有重试
+    attempts: int = 1
+    # 限速等待和重试退避的总时长（秒）
+    rate_limit_wait: float = 0.0
+    backoff_wait: float = 0.0
+
+
+def download_image(image_url: str, image_path: str, store: ImageStore, timeout: float = IMAGE_DOWNLOAD_TIMEOUT,
+                   max_bytes: int = IMAGE_MAX_BYTES, retry_policy: RetryPolicy = None,
+                   rate_limit: RateLimitConfig = None) -> ImageDownloadResult:
+    """
+    流式下载单张图片：分块写入临时文件，校验 Content-Type 与大小；
+    再经 normalize_image 校验、缩小并转为 JPEG，归一化后的图片收入图片仓库，硬链接到 image_path。
+    仓库中已有该 url 时不再发请求；超时、连接失败、429/5xx 按 retry_policy 指数退避加抖动重试。
+    每次请求都经过图片域名的限速器，与文章页一样按响应调速。
+    """
+    if os.path.exists(image_path):
+        return ImageDownloadResult(url=image_url, path=image_path, ok=True, size=os.path.getsize(image_path),
+                                   cached=True)
+    blob = store.lookup(image_url)
+    if blob:
+        store.link(blob, image_path)
+        logger.info(f"图片仓库命中: {image_url}")
+        return ImageDownloadResult(url=image_url, path=image_path, ok=True, size=os.path.getsize(image_path),
+                                   cached=True)
+    retry_policy = retry_policy or RetryPolicy()
+    breaker = get_circuit_breaker(image_url)
+    limiter = get_rate_limiter(image_url, rate_limit or RateLimitConfig())
+    rate_limit_wait = backoff_wait = 0.0
+    _start = time.time()
+    tmp_path = store.tmp_path(os.path.basename(image_path))
+    normalized_tmp_path = tmp_path + ".norm"
+    for attempt in range(1, retry_policy.max_attempts + 1):
+        if not breaker.allow():
+            logger.warning(f"{breaker.domain} 已熔断，跳过图片 {image_url}")
+            return ImageDownloadResult(url=image_url, path=image_path, ok=False, elapsed=time.time() - _start,
+                                       error="circuit open", attempts=attempt - 1, rate_limit_wait=rate_limit_wait,
+                                       backoff_wait=backoff_wait)
+        replaying = is_replaying()
+        if not replaying:
+            rate_limit_wait += limiter.acquire_blocking()
+        size = 0
+        headers_received = False
+        request_start = time.time()
+        try:
+            with http_get(image_url, timeout=timeout, accept=IMAGE_ACCEPT, stream=True) as response:
+                headers_received = True
+                if not replaying:
+                    limiter.record(response.status_code, time.time() - request_start,
+                                   response.headers.get("Retry-After"))
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "").lower()
+                if not content_type.startswith(ALLOWED_CONTENT_TYPES):
+                    raise ValueError(f"Content-Type 不是图片: {content_type}")
+                content_length = int(response.headers.get("Content-Length") or 0)
+                if content_length > max_bytes:
+                    raise ValueError(f"图片过大: {content_length} > {max_bytes}")
+                with open(tmp_path, "wb") as image_file:
+                    for chunk in response.iter_content(chunk_size=IMAGE_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise ValueError(f"图片过大: 已超过 {max_bytes} 字节")
+                        image_file.write(chunk)
+            breaker.record_success()
+            normalize_image(tmp_path, normalized_tmp_path)
+            os.remove(tmp_path)
+            store.link(store.put_file(normalized_tmp_path, file_digest(normalized_tmp_path), url=image_url),
+                       image_path)
+        except (requests.RequestException, ValueError, OSError) as e:
+            response = e.response if isinstance(e, requests.RequestException) else None
+            status = response.status_code if response is not None else None
+            # 收到响应头之后只有 429/5xx 可以重试，类型不符、过大、校验未通过重试也不会变
+            retryable = not headers_received or (status is not None and status in RETRYABLE_STATUS)
+            if not headers_received and not replaying:
+                limiter.record(None, time.time() - request_start)
+            if retryable:
+                breaker.record_failure()
+            else:
+                # 站点已经响应，只是图片本身有问题（4xx、类型或大小不符、校验未通过），不计入熔断；
+                # 半开状态下的探测请求也由此结束，否则熔断器会一直停在探测中
+                breaker.record_success()
+            for path in (tmp_path, normalized_tmp_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            if retryable and attempt < retry_policy.max_attempts:
+                # 回放时归档里的响应不会因为等待而变化，不退避
+                delay = 0.0 if replaying else retry_policy.backoff(attempt)
+                logger.warning(f"下载图片失败，{delay:.2f} 秒后第 {attempt + 1} 次尝试: {image_url} - {e}")
+                time.sleep(delay)
+                backoff_wait += delay
+                continue
+            elapsed = time.time() - _start
+            rejected = isinstance(e, ImageRejected)
+            logger.error(f"{'图片校验未通过' if rejected else '下载图片失败'}: {image_url} 耗时 {elapsed:.2f} 秒，"
+                         f"尝试 {attempt} 次 - {e}")
+            return ImageDownloadResult(url=image_url, path=image_path, ok=False, size=size, elapsed=elapsed,
+                                       error=str(e), rejected=rejected, attempts=attempt,
+                                       rate_limit_wait=rate_limit_wait, backoff_wait=backoff_wait)
+        elapsed = time.time() - _start
+        logger.info(f"下载图片完成: {image_url} {size} 字节，耗时 {elapsed:.2f} 秒")
+        return ImageDownloadResult(url=image_url, path=image_path, ok=True, size=size, elapsed=elapsed,
+                                   attempts=attempt, rate_limit_wait=rate_limit_wait, backoff_wait=backoff_wait)
+
+
+def record_image_metrics(source: str, results: list[ImageDownloadResult]):
+    """按结果统计图片数量；实际发出请求的图片记录下载字节数、耗时，以及限速和退避等待（与文章页共用 sleep_seconds）"""
+    metrics = get_metrics()
+    for r in results:
+        result = "cached" if r.cached else ("ok" if r.ok else ("rejected" if r.rejected else "failed"))
+        metrics.inc("images", source=source, result=result)
+        if not r.cached:
+            metrics.inc("image_bytes", r.size, source=source)
+            metrics.observe("image_download", r.elapsed, source=source)
+        if r.attempts > 1:
+            metrics.inc("image_retries", r.attempts - 1, source=source)
+        if r.rate_limit_wait > 0:
+            metrics.inc("sleep_seconds", r.rate_limit_wait, source=source, reason="image_rate_limit")
+        if r.backoff_wait > 0:
+            metrics.inc("sleep_seconds", r.backoff_wait, source=source, reason="image_retry_backoff")
+
+
+class ImageDownloader:
+    """
+    一期节目所有文章共用的图片下载线程池，限制同时下载的图片数量。
+    """
+
+    def __init__(self, max_workers: int = IMAGE_DOWNLOAD_WORKERS, store: ImageStore = None,
+                 retry_policy: RetryPolicy = None):
+        self.max_workers = max_workers
+        self.store = store or get_image_store()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image")
+        self.results: list[ImageDownloadResult] = []
+
+    async def download_article_images(self, article, today_path, rate_limit: RateLimitConfig = None) -> bool:
+        """
+        下载文章的所有图片，article.images 改为归一化后的 .jpg 文件名。
+        校验未通过的图片从文章中移除；其余图片全部下载成功且至少保留一张时返回 True。
+        :param rate_limit: 图片域名的限速配置，同一域名以第一次创建限速器时的配置为准
+        """
+        img_folder_path = os.path.join(today_path, article.folder)
+        os.makedirs(img_folder_path, exist_ok=True)
+        article.images = [normalized_image_name(image_name) for image_name in article.images]
+        loop = asyncio.get_running_loop()
+        download = functools.partial(download_image, store=self.store, retry_policy=self.retry_policy,
+                                     rate_limit=rate_limit)
+        futures = [loop.run_in_executor(self.executor, download, image_url, os.path.join(img_folder_path, image_name))
+                   for image_name, image_url in zip(article.images, article.image_urls)]
+        results = await asyncio.gather(*futures)
+        self.results.extend(results)
+        record_image_metrics(article.source, results)
+        kept = [(image_name, image_url) for image_name, image_url, r in zip(article.images, article.image_urls, results)
+                if not r.rejected]
+        if len(kept) < len(article.images):
+            logger.info(f'{article.url} 丢弃 {len(article.images) - len(kept)} 张校验未通过的图片')
+            article.images = [image_name for image_name, _ in kept]
+            article.image_urls = [image_url for _, image_url in kept]
+        cnt = sum(1 for r in results if r.ok)
+        images_done = cnt > 0 and cnt == len(article.images)
+        if not images_done:
+            logger.info(f'应该下载{len(article.images)}，实际下载了 {cnt} 张图片')
+        return images_done
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
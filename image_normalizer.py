@@ -0,0 +1,52 @@
+import os
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from utils import IMAGE_TARGET_WIDTH, IMAGE_TARGET_HEIGHT, IMAGE_MIN_WIDTH, IMAGE_MIN_HEIGHT, IMAGE_JPEG_QUALITY
+
+NORMALIZED_IMAGE_EXT = ".jpg"
+
+
+class ImageRejected(ValueError):
+    """图片无法解码或尺寸过小，不能作为新闻配图"""
+
+
+def normalized_image_name(name: str) -> str:
+    """归一化后的文件名，统一为 .jpg（BBC 的 abc.jpg.webp 在提取时已去掉 .webp）"""
+    return os.path.splitext(name)[0] + NORMALIZED_IMAGE_EXT
+
+
+def _flatten(img: Image.Image) -> Image.Image:
+    # 透明背景（png、webp）铺白底，再统一转成 RGB
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def normalize_image(src_path: str, dst_path: str, max_size: tuple[int, int] = (IMAGE_TARGET_WIDTH, IMAGE_TARGET_HEIGHT),
+                    min_size: tuple[int, int] = (IMAGE_MIN_WIDTH, IMAGE_MIN_HEIGHT)) -> tuple[int, int]:
+    """
+    校验图片能否完整解码，丢弃尺寸过小的图片，按比例缩小到视频中的显示区域以内，保存为 JPEG。
+    之后像素化和合成视频都只处理这份尺寸有上限的图片。
+    :return: 归一化后的 (宽, 高)
+    :raise ImageRejected: 图片损坏、格式无法识别或尺寸过小
+    """
+    try:
+        with Image.open(src_path) as img:
+            img.verify()
+        with Image.open(src_path) as img:
+            width, height = img.size
+            if width < min_size[0] or height < min_size[1]:
+                raise ImageRejected(f"图片尺寸过小: {width}x{height}")
+            # JPEG 解码时直接按 1/2、1/4、1/8 缩小，减少大图的解码开销
+            img.draft("RGB", max_size)
+            img = ImageOps.exif_transpose(img)
+            img = _flatten(img)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as e:
+        raise ImageRejected(f"图片无法解码: {e}") from e
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    img.save(dst_path, "JPEG", quality=IMAGE_JPEG_QUALITY)
+    return img.size
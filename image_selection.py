@@ -0,0 +1,94 @@
+import math
+import re
+from urllib.parse import urljoin
+
+from utils import (IMAGE_TARGET_WIDTH, IMAGE_TARGET_HEIGHT, IMAGE_ASSUMED_ASPECT, IMAGE_MIN_WIDTH,
+                   IMAGE_SECONDS_PER_IMAGE, NARRATION_CHARS_PER_SECOND, SUMMARY_MAX_CHARS, IMAGE_MAX_PER_ARTICLE)
+
+# 图标、logo、占位图等不适合作为新闻配图的 url 特征
+ICON_URL_PATTERN = re.compile(r"logo|icon|placeholder|sprite|avatar|badge|\.svg(\?|$)|\.gif(\?|$)", re.IGNORECASE)
+_DESCRIPTOR = re.compile(r"^(\d+(?:\.\d+)?)([wx])$")
+# "a.jpg 240w,b.jpg 480w" 这种逗号后没有空格的写法，先补上空格再按空白切分
+_DESCRIPTOR_COMMA = re.compile(r"(\d[wx]),(?=\S)")
+# 英文原文与中文摘要的字数比例，粗略估算
+EN_CHARS_PER_CN_CHAR = 3
+
+
+def parse_srcset(srcset: str, base_url: str = None) -> list[tuple[str, int | None]]:
+    """
+    解析 srcset，返回 [(url, 宽度)]。url 中可能带逗号（如 ?resize=770,513），所以按空白切分，
+    宽度描述符跟在 url 后面；x 描述符和没有描述符的条目宽度为 None。
+    """
+    candidates = []
+    for token in _DESCRIPTOR_COMMA.sub(r"\1, ", srcset or "").split():
+        token = token.rstrip(",")
+        match = _DESCRIPTOR.match(token)
+        if match and candidates:
+            if match.group(2) == "w":
+                candidates[-1] = (candidates[-1][0], int(float(match.group(1))))
+        elif token:
+            candidates.append((urljoin(base_url, token) if base_url else token, None))
+    return candidates
+
+
+def target_width(width: int = None, height: int = None) -> int:
+    """图片缩放到显示区域后的实际宽度；不知道宽高比时按 IMAGE_ASSUMED_ASPECT 估算"""
+    aspect = width / height if width and height else IMAGE_ASSUMED_ASPECT
+    return int(min(IMAGE_TARGET_WIDTH, IMAGE_TARGET_HEIGHT * aspect))
+
+
+def pick_srcset(srcset: str, base_url: str = None, width: int = None, height: int = None) -> str | None:
+    """
+    选出宽度不小于显示宽度的最小候选；都比显示宽度小时取最大的；没有宽度描述符时取最后一个。
+    最大候选也小于 IMAGE_MIN_WIDTH 时视为图标，返回 None。
+    """
+    candidates = [(url, w) for url, w in parse_srcset(srcset, base_url) if not ICON_URL_PATTERN.search(url)]
+    if not candidates:
+        return None
+    sized = [(url, w) for url, w in candidates if w]
+    if not sized:
+        return candidates[-1][0]
+    if max(w for _, w in sized) < IMAGE_MIN_WIDTH:
+        return None
+    need = target_width(width, height)
+    large_enough = [(url, w) for url, w in sized if w >= need]
+    if large_enough:
+        return min(large_enough, key=lambda x: x[1])[0]
+    return max(sized, key=lambda x: x[1])[0]
+
+
+def _int_attr(tag, name: str) -> int | None:
+    value = (tag.get(name) or "").strip().removesuffix("px")
+    return int(value) if value.isdigit() else None
+
+
+def pick_image(tag, base_url: str = None) -> str | None:
+    """
+    从 <img> 或 <source> 中选出要下载的图片 url：优先 srcset / data-srcset，否则用 src；
+    标注的宽高小于 IMAGE_MIN_WIDTH、url 像图标或是 data: 内联图片时返回 None。
+    """
+    width, height = _int_attr(tag, "width"), _int_attr(tag, "height")
+    if width and width < IMAGE_MIN_WIDTH:
+        return None
+    srcset = tag.get("srcset") or tag.get("data-srcset")
+    if srcset:
+        return pick_srcset(srcset, base_url, width, height)
+    src = tag.get("src") or tag.get("data-src")
+    if not src or src.startswith("data:") or ICON_URL_PATTERN.search(src):
+        return None
+    return urljoin(base_url, src) if base_url else src
+
+
+def image_budget(text: str, cjk: bool = False) -> int:
+    """
+    按预计的播报时长计算一篇文章最多使用几张图片。
+    播报内容是不超过 SUMMARY_MAX_CHARS 字的中文摘要，正文越短摘要越短。
+    """
+    summary_chars = min(SUMMARY_MAX_CHARS, len(text or "") if cjk else len(text or "") // EN_CHARS_PER_CN_CHAR)
+    seconds = summary_chars / NARRATION_CHARS_PER_SECOND
+    return max(1, min(IMAGE_MAX_PER_ARTICLE, math.ceil(seconds / IMAGE_SECONDS_PER_IMAGE)))
+
+
+def limit_images(image_urls: list[str], text: str, cjk: bool = False) -> list[str]:
+    """去重后按 image_budget 截断，保留文章中靠前的图片"""
+    return list(dict.fromkeys(image_urls))[:image_budget(text, cjk)]
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import shutil
+import threading
+
+from logging_config import logger
+from shared_instance import SharedInstance
+from utils import IMAGE_STORE_FOLDER_NAME
+
+URL_INDEX_FILE_NAME = "url_index.tsv"
+
+
+
+class ImageStore:
+    """
+    按内容 sha256 存放图片的 blob 仓库，文章目录下的图片是指向 blob 的硬链接。
+    url_index.tsv 以追加方式记录 url -> sha256，已知 url 不再重复下载，相同内容只存一份。
+    """
+
+    def __init__(self, folder: str = IMAGE_STORE_FOLDER_NAME):
+        self.folder = folder
+        self._lock = threading.RLock()
+        self._url_index: dict[str, str] = {}
+        os.makedirs(folder, exist_ok=True)
+        self._load_url_index()
+
+    def _index_path(self) -> str:
+        return os.path.join(self.folder, URL_INDEX_FILE_NAME)
+
+    def _load_url_index(self):
+        index_path = self._index_path()
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            for line in index_file:
+                url, _, digest = line.rstrip("\n").rpartition("\t")
+                if url and digest:
+                    self._url_index[url] = digest
+        logger.info(f"图片仓库已加载 {len(self._url_index)} 个 url 索引")
+
+    def blob_path(self, digest: str, suffix: str = "") -> str:
+        return os.path.join(self.folder, digest[:2], digest + suffix)
+
+    def lookup(self, url: str) -> str | None:
+        """返回 url 对应且仍存在的 blob 路径"""
+        digest = self._url_index.get(url)
+        if digest and os.path.exists(self.blob_path(digest)):
+            return self.blob_path(digest)
+        return None
+
+    def tmp_path(self, name: str) -> str:
+        return os.path.join(self.folder, f"{name}.{threading.get_ident()}.part")
+
+    def put_file(self, tmp_path: str, digest: str, url: str = None) -> str:
+        """把已写完的临时文件收入仓库，内容已存在时直接丢弃临时文件"""
+        blob = self.blob_path(digest)
+        with self._lock:
+            if os.path.exists(blob):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.replace(tmp_path, blob)
+            if url and self._url_index.get(url) != digest:
+                self._url_index[url] = digest
+                with open(self._index_path(), "a", encoding="utf-8") as index_file:
+                    index_file.write(f"{url}\t{digest}\n")
+        return blob
+
+    def link(self, blob: str, target_path: str):
+        if os.path.exists(target_path):
+            return
+        try:
+            os.link(blob, target_path)
+        except OSError:
+            # 跨文件系统等无法硬链接的情况退化为复制
+            shutil.copyfile(blob, target_path)
+
+    def derive(self, src_path: str, target_path: str, tag: str, producer) -> str:
+        """
+        对 src_path 的内容做一次转换（如像素化），结果按 源内容sha256 + tag 缓存，
+        相同图片只转换一次，target_path 链接到缓存结果。
+        :param producer: producer(src_path, output_path)，output_path 与 target_path 扩展名相同
+        """
+        ext = os.path.splitext(target_path)[1]
+        derived = self.blob_path(file_digest(src_path), f".{tag}{ext}")
+        if not os.path.exists(derived):
+            os.makedirs(os.path.dirname(derived), exist_ok=True)
+            tmp_path = f"{derived[:len(derived) - len(ext)]}.{threading.get_ident()}.tmp{ext}"
+            producer(src_path, tmp_path)
+            os.replace(tmp_path, derived)
+        else:
+            logger.info(f"{src_path} 已有 {tag} 结果，直接复用")
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        self.link(derived, target_path)
+        return target_path
+
+    def gc(self) -> int:
+        """删除已没有任何文章目录引用（硬链接数为 1）的 blob，并压缩 url 索引"""
+        removed = 0
+        with self._lock:
+            for sub in os.listdir(self.folder):
+                sub_path = os.path.join(self.folder, sub)
+                if not os.path.isdir(sub_path):
+                    continue
+                for name in os.listdir(sub_path):
+                    path = os.path.join(sub_path, name)
+                    if os.stat(path).st_nlink <= 1:
+                        os.remove(path)
+                        removed += 1
+            self._url_index = {url: digest for url, digest in self._url_index.items()
+                               if os.path.exists(self.blob_path(digest))}
+            tmp_path = self._index_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as index_file:
+                for url, digest in self._url_index.items():
+                    index_file.write(f"{url}\t{digest}\n")
+            os.replace(tmp_path, self._index_path())
+        logger.info(f"图片仓库清理完成，删除 {removed} 个未引用的文件，保留 {len(self._url_index)} 个 url 索引")
+        return removed
+
+
+_default_store = SharedInstance(ImageStore)
+
+
+def set_image_store(store: ImageStore):
+    """替换共用的图片仓库。回放时指向本次回放的临时目录，回放下载的图片不进入真实仓库"""
+    _default_store.set(store)
+
+
+def get_image_store() -> ImageStore:
+    """进程内共用的图片仓库，避免重复加载 url 索引"""
+    return _default_store.get()
+
+
+def file_digest(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
@@ -0,0 +1,164 @@
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from logging_config import logger
+from shared_instance import SharedInstance
+from utils import NEAR_DUP_DB_PATH, NEAR_DUP_MAX_DISTANCE, NEAR_DUP_WINDOW_DAYS, NEAR_DUP_CONTENT_CHARS
+
+
+FINGERPRINT_BITS = 64
+# 指纹切成 BANDS 段做分桶，距离不超过 BANDS - 1 的两个指纹至少有一段完全相同
+BANDS = NEAR_DUP_MAX_DISTANCE + 1
+# 英文按单词、中文按单字切分
+_TOKEN = re.compile(r"[a-z0-9]+|[一-鿿]")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall((text or "").casefold())
+
+
+def simhash(title: str, content: str, content_chars: int = NEAR_DUP_CONTENT_CHARS) -> int:
+    """
+    标题和正文开头的 64 位 SimHash，特征为相邻两个词（字），标题的特征权重加倍。
+    """
+    features = Counter()
+    for text, weight in ((title, 2), ((content or "")[:content_chars], 1)):
+        tokens = _tokens(text)
+        for shingle in zip(tokens, tokens[1:]) if len(tokens) > 1 else ((t,) for t in tokens):
+            features[" ".join(shingle)] += weight
+    vector = [0] * FINGERPRINT_BITS
+    for feature, weight in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            vector[bit] += weight if h >> bit & 1 else -weight
+    return sum(1 << bit for bit in range(FINGERPRINT_BITS) if vector[bit] > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _bands(fingerprint: int) -> list[int]:
+    width = FINGERPRINT_BITS // BANDS
+    return [(fingerprint >> (i * width)) & ((1 << width) - 1) for i in range(BANDS)]
+
+
+@dataclass
+class StoryRecord:
+    url: str
+    source: str
+    title: str
+    fingerprint: int
+    seen_date: str
+
+
+class NearDuplicateIndex:
+    """
+    跨新闻源、跨天的近似重复新闻索引（SQLite 持久化，内存中按指纹分段建桶）。
+    同一条新闻被多个新闻源报道、或第二天换了 url 再次出现时，只有第一篇继续后续的摘要、配音和视频生成。
+    """
+
+    def __init__(self, db_path: str = NEAR_DUP_DB_PATH, max_distance: int = NEAR_DUP_MAX_DISTANCE,
+                 window_days: int = NEAR_DUP_WINDOW_DAYS):
+        self.db_path = db_path
+        self.max_distance = max_distance
+        self.window_days = window_days
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS stories ("
+                           "url TEXT PRIMARY KEY, source TEXT NOT NULL, title TEXT, "
+                           "fingerprint TEXT NOT NULL, seen_date TEXT NOT NULL)")
+        self._conn.commit()
+        self._records: dict[str, StoryRecord] = {}
+        self._buckets: list[dict[int, set[str]]] = [{} for _ in range(BANDS)]
+        for url, source, title, fingerprint, seen_date in self._conn.execute("SELECT * FROM stories"):
+            self._index(StoryRecord(url, source, title, int(fingerprint, 16), seen_date))
+
+    def _index(self, record: StoryRecord):
+        self._records[record.url] = record
+        for bucket, band in zip(self._buckets, _bands(record.fingerprint)):
+            bucket.setdefault(band, set()).add(record.url)
+
+    def _unindex(self, url: str) -> StoryRecord | None:
+        record = self._records.pop(url, None)
+        if record:
+            for bucket, band in zip(self._buckets, _bands(record.fingerprint)):
+                bucket.get(band, set()).discard(url)
+        return record
+
+    def _window_start(self, today: str) -> str:
+        return (datetime.strptime(today, "%Y%m%d") - timedelta(days=self.window_days)).strftime("%Y%m%d")
+
+    def find(self, fingerprint: int, url: str, today: str) -> StoryRecord | None:
+        """窗口期内与 fingerprint 距离最近且不超过 max_distance 的其它新闻"""
+        window_start = self._window_start(today)
+        candidates = set()
+        for bucket, band in zip(self._buckets, _bands(fingerprint)):
+            candidates |= bucket.get(band, set())
+        best = None
+        for other_url in candidates - {url}:
+            record = self._records[other_url]
+            distance = hamming_distance(fingerprint, record.fingerprint)
+            if record.seen_date >= window_start and distance <= self.max_distance:
+                if best is None or distance < best[0]:
+                    best = (distance, record)
+        return best[1] if best else None
+
+    def claim(self, url: str, source: str, title: str, content: str, today: str = None) -> StoryRecord | None:
+        """
+        检查并登记一篇新闻。已有近似重复的新闻时返回那一篇，不登记；否则登记并返回 None。
+        查找和登记在同一把锁内完成，多个新闻源并发处理同一条新闻时只有一篇能登记成功。
+        """
+        today = today or datetime.now().strftime("%Y%m%d")
+        fingerprint = simhash(title, content)
+        with self._lock:
+            duplicate = self.find(fingerprint, url, today)
+            if duplicate:
+                return duplicate
+            self._unindex(url)
+            self._index(StoryRecord(url, source, title, fingerprint, today))
+            self._conn.execute("INSERT OR REPLACE INTO stories VALUES (?, ?, ?, ?, ?)",
+                               (url, source, title, f"{fingerprint:016x}", today))
+            self._conn.commit()
+        return None
+
+    def release(self, url: str):
+        """撤销登记，用于登记后又因图片下载失败等原因被丢弃的新闻"""
+        with self._lock:
+            if self._unindex(url):
+                self._conn.execute("DELETE FROM stories WHERE url = ?", (url,))
+                self._conn.commit()
+
+    def prune(self, today: str = None) -> int:
+        window_start = self._window_start(today or datetime.now().strftime("%Y%m%d"))
+        with self._lock:
+            expired = [url for url, record in self._records.items() if record.seen_date < window_start]
+            for url in expired:
+                self._unindex(url)
+            self._conn.execute("DELETE FROM stories WHERE seen_date < ?", (window_start,))
+            self._conn.commit()
+        logger.info(f"已清理 {len(expired)} 条过期的新闻指纹")
+        return len(expired)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_index = SharedInstance(NearDuplicateIndex)
+
+
+def set_near_duplicate_index(index: NearDuplicateIndex):
+    """替换共用的近似重复索引。回放时换成内存库，回放认领的新闻不会让之后的真实爬取把它们当成重复"""
+    _default_index.set(index)
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """各新闻源共用的近似重复索引，跨新闻源、跨天的重复判断都依赖同一份指纹"""
+    return _default_index.get()
@@ -1,7 +1,9 @@
 import os
 
 import requests
-from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Callable, List
+from concurrent.futures import ThreadPoolExecutor, Future
 from logging_config import logger
 import time
 from functools import wraps
@@ -11,6 +13,8 @@ lock = threading.RLock()
 
 MODEL_NAME = "deepseek-r1:8b"
 # MODEL_NAME = "qwen3:8b"
+# 同时发给 Ollama 的请求数，与服务端的并行槽位（OLLAMA_NUM_PARALLEL）保持一致，多发的请求只会在服务端排队
+MAX_IN_FLIGHT = 4
 def timeit(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -23,9 +27,15 @@ def timeit(func):
     return wrapper
 
 
+def untimed(func):
+    """不调用模型的方法（关闭连接、提交批量任务）不打印耗时，批量方法的耗时由其中的单篇调用各自打印"""
+    func.untimed = True
+    return func
+
+
 def timeit_methods(cls):
     for name, value in vars(cls).items():
-        if callable(value) and not name.startswith("_"):  # 忽略私有方法
+        if callable(value) and not name.startswith("_") and not getattr(value, "untimed", False):  # 忽略私有方法
             setattr(cls, name, timeit(value))
     return cls
 
@@ -33,8 +43,36 @@ def timeit_methods(cls):
 @timeit_methods
 class OllamaClient:
 
-    def __init__(self, base_url: str = "http://47.120.48.245:11434"):
+    def __init__(self, base_url: str = "http://47.120.48.245:11434", max_in_flight: int = MAX_IN_FLIGHT):
         self.base_url = base_url
+        self.max_in_flight = max_in_flight
+        # 复用到 base_url 的 keep-alive 连接，连接数与并发上限一致
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight))
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight))
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # 延迟创建，只做单篇调用时不启动线程池
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="ollama")
+            return self._executor
+
+    @untimed
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _extract_think(self, text, is_replace_line=True):
         think_end = text.find('</think>')
@@ -94,7 +132,7 @@ class OllamaClient:
             "options": options or {},
             "stream": False
         }
-        response = requests.post(url, json=payload)
+        response = self._session.post(url, json=payload)
 
         # 检查 HTTP 状态码是否为 200 (OK)
         if response.status_code == 200:
@@ -112,7 +150,7 @@ class OllamaClient:
 
     def get_models(self) -> Dict[str, Any]:
         url = f"{self.base_url}/api/tags"
-        response = requests.get(url)
+        response = self._session.get(url)
         return response.json()
 
     def generate_summary(self, text: str, model: str = MODEL_NAME, max_tokens: int = 200) -> str:
@@ -261,6 +299,35 @@ class OllamaClient:
         response = self._generate_text_local(prompt, model)
         return self._extract_think(response.get("response", ""))
 
+    @untimed
+    def submit_batch(self, method: Callable[..., str], texts: List[str], **kwargs) -> List[Future]:
+        """
+        把一批文本交给线程池，每个文本调用一次 method（本客户端的单篇方法），同时最多 max_in_flight 个请求。
+        多批请求先全部提交再取结果，可以共用并发名额，例如标题翻译和摘要同时进行。
+
+        :param method: 单篇方法，如 self.translate_to_chinese
+        :param texts: 输入文本列表
+        :param kwargs: 传给 method 的其它参数，如 model、max_tokens
+        :return: 与 texts 顺序一致的 Future 列表
+        """
+        executor = self._get_executor()
+        return [executor.submit(method, text, **kwargs) for text in texts]
+
+    @untimed
+    def translate_to_chinese_batch(self, texts: List[str], model: str = MODEL_NAME) -> List[str]:
+        return [f.result() for f in self.submit_batch(self.translate_to_chinese, texts, model=model)]
+
+    @untimed
+    def generate_summary_batch(self, texts: List[str], model: str = MODEL_NAME, max_tokens: int = 200) -> List[str]:
+        return [f.result() for f in self.submit_batch(self.generate_summary, texts, model=model,
+                                                      max_tokens=max_tokens)]
+
+    @untimed
+    def generate_summary_cn_batch(self, texts: List[str], model: str = MODEL_NAME,
+                                  max_tokens: int = 200) -> List[str]:
+        return [f.result() for f in self.submit_batch(self.generate_summary_cn, texts, model=model,
+                                                      max_tokens=max_tokens)]
+
 
 if __name__ == '__main__':
     client = OllamaClient()
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from logging_config import logger
+
+_limiters: dict[str, "AdaptiveRateLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+# 这些状态码表示对方在限流或过载，需要降速
+THROTTLE_STATUS = (429, 503)
+
+
+@dataclass
+class RateLimitConfig:
+    # 每秒允许的请求数
+    rate: float = 1.0
+    # 令牌桶容量，空闲后允许连续发出的请求数
+    burst: int = 3
+    min_rate: float = 0.05
+    max_rate: float = 4.0
+    # 响应耗时超过该值（秒）视为对方变慢
+    slow_latency: float = 5.0
+    # 健康响应后每次增加的速率
+    increase_step: float = 0.1
+    # 限流或变慢时速率乘以该系数
+    decrease_factor: float = 0.5
+
+
+class AdaptiveRateLimiter:
+    """
+    按域名共享的令牌桶限速器（AIMD 调速）。
+    令牌足够时请求立即发出，不足时只让当前请求等待到下一个令牌；
+    健康响应逐步提速，429/503、超时或响应变慢时成倍降速。
+    """
+
+    def __init__(self, domain: str, config: RateLimitConfig):
+        self.domain = domain
+        self.config = config
+        self.rate = config.rate
+        self._tokens = float(config.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """取一个令牌，返回需要等待的秒数；令牌不足时预支，后续请求依次排队"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.config.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    async def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def acquire_blocking(self) -> float:
+        """在线程池中使用的同步版本，如图片下载"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, status: int | None, latency: float, retry_after: str = None):
+        """
+        根据响应调整速率。
+        :param status: HTTP 状态码，请求异常（超时、连接失败）时为 None
+        """
+        with self._lock:
+            old_rate = self.rate
+            if status in THROTTLE_STATUS or status is None or latency > self.config.slow_latency:
+                self.rate = max(self.config.min_rate, self.rate * self.config.decrease_factor)
+                if retry_after and retry_after.isdigit():
+                    self._paused_until = time.monotonic() + int(retry_after)
+            elif status < 400:
+                self.rate = min(self.config.max_rate, self.rate + self.config.increase_step)
+            new_rate = self.rate
+        if new_rate < old_rate:
+            logger.warning(f"{self.domain} 状态码={status} 耗时={latency:.2f}秒，降速 {old_rate:.2f} -> {new_rate:.2f} 次/秒")
+
+
+def get_rate_limiter(url: str, config: RateLimitConfig) -> AdaptiveRateLimiter:
+    """同一域名的所有爬虫、协程和线程共用一个限速器，以第一次创建时的配置为准"""
+    domain = urlsplit(url).netloc
+    with _limiters_lock:
+        limiter = _limiters.get(domain)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(domain, config)
+            _limiters[domain] = limiter
+        return limiter
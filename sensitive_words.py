@@ -0,0 +1,110 @@
+import json
+import threading
+from collections import deque
+
+from logging_config import logger
+from utils import SENSITIVE_WORDS_PATH
+
+_matchers: dict[str, "SensitiveWordMatcher"] = {}
+_matchers_lock = threading.Lock()
+
+
+class AhoCorasick:
+    """
+    多模式匹配自动机：构建一次，之后对任意文本单次扫描即可统计所有模式的出现次数。
+    """
+
+    def __init__(self, patterns: list[str], case_insensitive: bool = False):
+        self.case_insensitive = case_insensitive
+        self.patterns = [p for p in dict.fromkeys(patterns) if p]
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[int]] = [[]]
+        for idx, pattern in enumerate(self.patterns):
+            self._add(self._fold(pattern), idx)
+        self._build_fail()
+
+    def _fold(self, text: str) -> str:
+        return text.casefold() if self.case_insensitive else text
+
+    def _add(self, pattern: str, idx: int):
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = nxt
+        self._output[state].append(idx)
+
+    def _build_fail(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def iter_matches(self, text: str):
+        """依次产出命中的模式下标"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in self._fold(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            yield from output[state]
+
+    def count(self, text: str) -> dict[str, int]:
+        """返回 {模式: 出现次数}，只包含出现过的模式"""
+        counts: dict[str, int] = {}
+        for idx in self.iter_matches(text):
+            pattern = self.patterns[idx]
+            counts[pattern] = counts.get(pattern, 0) + 1
+        return counts
+
+
+class SensitiveWordMatcher:
+    """
+    命中的不同敏感词数量达到 threshold 即视为敏感，达到后立即停止扫描。
+    """
+
+    def __init__(self, words: list[str], threshold: int = 1, case_insensitive: bool = False):
+        self.threshold = threshold
+        self.automaton = AhoCorasick(words, case_insensitive=case_insensitive)
+
+    def count(self, text: str) -> dict[str, int]:
+        return self.automaton.count(text) if text else {}
+
+    def is_sensitive(self, text: str) -> bool:
+        if not text:
+            return False
+        hit = set()
+        for idx in self.automaton.iter_matches(text):
+            hit.add(idx)
+            if len(hit) >= self.threshold:
+                return True
+        return False
+
+
+def load_sensitive_words(path: str = SENSITIVE_WORDS_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as config_file:
+        return json.load(config_file)
+
+
+def get_matcher(lang: str) -> SensitiveWordMatcher:
+    """按语言（cn / en）返回进程内共用的敏感词匹配器，首次调用时从配置文件构建"""
+    with _matchers_lock:
+        if not _matchers:
+            for name, config in load_sensitive_words().items():
+                _matchers[name] = SensitiveWordMatcher(config["words"], threshold=config.get("threshold", 1),
+                                                       case_insensitive=config.get("case_insensitive", False))
+                logger.info(f"敏感词匹配器 {name} 构建完成，共 {len(config['words'])} 个词")
+        return _matchers[lang]
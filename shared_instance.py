@@ -0,0 +1,26 @@
+import threading
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SharedInstance(Generic[T]):
+    """
+    进程内共用的单个实例：第一次 get 时用 factory 创建，之后所有线程拿到同一个；
+    set 可以整体替换，例如回放时换成内存库或临时目录。
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: T | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        with self._lock:
+            if self._instance is None:
+                self._instance = self._factory()
+            return self._instance
+
+    def set(self, instance: T):
+        with self._lock:
+            self._instance = instance
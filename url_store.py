@@ -0,0 +1,108 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from logging_config import logger
+from shared_instance import SharedInstance
+from utils import VISITED_URLS_DB_PATH, VISITED_URLS_WINDOW_DAYS
+
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAM_PREFIXES = ("utm_", "at_", "fbclid", "gclid", "ocid")
+
+
+def normalize_url(url: str) -> str:
+    """
+    统一 url 写法：域名小写、去掉 fragment、跟踪参数和末尾的 /，
+    避免同一篇文章因链接写法不同被重复爬取。
+    """
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAM_PREFIXES)]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+class VisitedUrlStore:
+    """
+    已访问 url 的 SQLite 索引，按规范化后的 url 建主键，只在 window_days 天的滚动窗口内判重。
+    替代按月存放的 {YYYYMM}_visited_urls.json，月初不会再把上月末的文章重新爬一遍。
+    多个爬虫线程共用同一个连接，写操作加锁。
+    """
+
+    def __init__(self, db_path: str = VISITED_URLS_DB_PATH, window_days: int = VISITED_URLS_WINDOW_DAYS):
+        self.db_path = db_path
+        self.window_days = window_days
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS visited_urls ("
+                           "url TEXT PRIMARY KEY, visited_date TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_visited_date ON visited_urls (visited_date)")
+        self._conn.commit()
+        if db_path != ":memory:":
+            self._import_month_json_files()
+
+    def _window_start(self, today: str = None) -> str:
+        day = datetime.strptime(today, "%Y%m%d") if today else datetime.now()
+        return (day - timedelta(days=self.window_days)).strftime("%Y%m%d")
+
+    def contains(self, url: str, today: str = None) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM visited_urls WHERE url = ? AND visited_date >= ?",
+                                     (normalize_url(url), self._window_start(today))).fetchone()
+        return row is not None
+
+    def __contains__(self, url: str) -> bool:
+        return self.contains(url)
+
+    def add_many(self, urls, today: str = None) -> None:
+        today = today or datetime.now().strftime("%Y%m%d")
+        rows = [(normalize_url(url), today) for url in urls if url]
+        with self._lock:
+            self._conn.executemany("INSERT INTO visited_urls (url, visited_date) VALUES (?, ?) "
+                                   "ON CONFLICT(url) DO UPDATE SET visited_date = excluded.visited_date", rows)
+            self._conn.commit()
+        logger.info(f"已保存 {today} 的已访问URL {len(rows)} 个到 {self.db_path}")
+
+    def prune(self, today: str = None) -> int:
+        """删除滚动窗口之外的记录"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM visited_urls WHERE visited_date < ?",
+                                        (self._window_start(today),))
+            self._conn.commit()
+        logger.info(f"已清理 {cursor.rowcount} 个过期的已访问URL")
+        return cursor.rowcount
+
+    def _import_month_json_files(self):
+        """一次性导入旧的 {YYYYMM}_visited_urls.json，导入后重命名为 .imported"""
+        for json_file_path in sorted(glob.glob("*_visited_urls.json")):
+            year_month = os.path.basename(json_file_path)[:6]
+            with open(json_file_path, "r", encoding="utf-8") as json_file:
+                urls = json.load(json_file)
+            # 旧文件没有记录访问日期，按该月最后一天导入
+            last_day = (datetime.strptime(year_month, "%Y%m") + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+            self.add_many(urls, last_day.strftime("%Y%m%d"))
+            os.replace(json_file_path, json_file_path + ".imported")
+            logger.info(f"已导入 {json_file_path} 中的 {len(urls)} 个已访问URL")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_store = SharedInstance(VisitedUrlStore)
+
+
+def set_visited_url_store(store: VisitedUrlStore):
+    """替换共用的已访问 url 索引。回放时换成内存库，否则回放抓过的链接会在真实爬取中被当成已访问而跳过"""
+    _default_store.set(store)
+
+
+def get_visited_url_store() -> VisitedUrlStore:
+    """各新闻源共用的已访问 url 索引，按窗口期判断链接是否抓过"""
+    return _default_store.get()
@@ -11,10 +11,38 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 NEWS_JSON_FILE_NAME = "news_results.json"
 NEWS_JSON_FILE_NAME_PROCESSED = "news_results_processed.json"
+# 每个新闻源目录下的逐篇爬取日志，用于中断后续爬
+CRAWL_JOURNAL_FILE_NAME = "crawl_journal.jsonl"
 NEWS_FOLDER_NAME = "news"
+HTTP_CACHE_FOLDER_NAME = "http_cache"
+HTTP_ARCHIVE_FOLDER_NAME = "http_archive"
+METRICS_FOLDER_NAME = "metrics"
+BENCHMARK_FOLDER_NAME = "benchmarks"
+IMAGE_STORE_FOLDER_NAME = os.path.join(NEWS_FOLDER_NAME, "blobs")
+VISITED_URLS_DB_PATH = "visited_urls.db"
+# 已访问 url 的判重窗口（天）
+VISITED_URLS_WINDOW_DAYS = 35
+# 模板段落指纹库：同一新闻源中出现在至少 BOILERPLATE_MIN_ARTICLES 篇文章里的段落视为模板，
+# BOILERPLATE_WINDOW_DAYS 天内没再出现的指纹会被清理
+BOILERPLATE_DB_PATH = "boilerplate.db"
+BOILERPLATE_MIN_ARTICLES = 3
+BOILERPLATE_WINDOW_DAYS = 30
+# 近似重复新闻索引：标题加正文开头的 SimHash 汉明距离不超过 NEAR_DUP_MAX_DISTANCE 视为同一条新闻，
+# 只与 NEAR_DUP_WINDOW_DAYS 天内出现过的新闻比较
+NEAR_DUP_DB_PATH = "near_duplicates.db"
+NEAR_DUP_MAX_DISTANCE = 6
+NEAR_DUP_WINDOW_DAYS = 7
+NEAR_DUP_CONTENT_CHARS = 500
+SENSITIVE_WORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "sensitive_words.json")
 FINAL_VIDEOS_FOLDER_NAME = "final_videos"
 AUDIO_FILE_NAME = "summary_audio.mp3"
 SUB_LIST_LENGTH = 7
+# BeautifulSoup 解析器，可选 lxml / html.parser / html5lib
+HTML_PARSER = "lxml"
+# 单个新闻源默认的并发请求上限
+DEFAULT_SOURCE_CONCURRENCY = 4
+# 爬虫阻塞 IO 线程池的最小容量
+CRAWL_IO_WORKERS = 16
 
 RT = "rt"
 ALJ = "rlj"
@@ -26,6 +54,16 @@ PROXY = {
     'https': 'http://127.0.0.1:10809',
 }
 
+# 每个域名 keep-alive 连接池的最大连接数
+HTTP_POOL_SIZE = 8
+# 进程内预生成的 User-Agent 数量
+USER_AGENT_POOL_SIZE = 50
+# 一期节目共用的图片下载线程数、单张图片大小上限、分块大小和超时（秒）
+IMAGE_DOWNLOAD_WORKERS = 8
+IMAGE_MAX_BYTES = 15 * 1024 * 1024
+IMAGE_CHUNK_SIZE = 64 * 1024
+IMAGE_DOWNLOAD_TIMEOUT = 7
+
 BACKGROUND_IMAGE_PATH = "videos/generated_background.png"
 BACKGROUND_IMAGE_INNER_PATH = "videos/generated_background_inner.png"
 GLOBAL_WIDTH = 1920
@@ -35,6 +73,21 @@ INNER_WIDTH = GLOBAL_WIDTH - GAP
 INNER_HEIGHT = GLOBAL_HEIGHT - GAP
 W_H_RADIO = GLOBAL_WIDTH / GLOBAL_HEIGHT
 W_H_RADIO = "{:.2f}".format(W_H_RADIO)
+# 新闻图片在 generate_single_video 中的显示区域（标题栏以下、摘要以上）
+IMAGE_TARGET_WIDTH = INNER_WIDTH
+IMAGE_TARGET_HEIGHT = int((INNER_HEIGHT - 40) * 0.75)
+# srcset 只给出宽度时按该宽高比估算需要的宽度
+IMAGE_ASSUMED_ASPECT = 16 / 9
+# 宽度小于该值的图片视为图标、logo
+IMAGE_MIN_WIDTH = 300
+# 入库时解码后短边小于该高度的图片直接丢弃；归一化后统一保存为该质量的 JPEG
+IMAGE_MIN_HEIGHT = 200
+IMAGE_JPEG_QUALITY = 90
+# 每张图片的平均展示时长（秒）、播报语速（字/秒）和摘要字数上限，用于计算每篇文章的图片数
+IMAGE_SECONDS_PER_IMAGE = 8
+NARRATION_CHARS_PER_SECOND = 4.5
+SUMMARY_MAX_CHARS = 200
+IMAGE_MAX_PER_ARTICLE = 5
 FPS = 65
 MAIN_BG_COLOR = "#FF9900"
 VIDEO_FILE_NAME = "final.mp4"
@@ -185,24 +238,6 @@ def build_articles_json_path(today=datetime.now().strftime("%Y%m%d"), time_tag=0
     return path
 
 
-def load_month_urls(year_month: str) -> set:
-    """
-    加载指定年月的已访问 URL 集合，并在追加新 URL 时写回文件。
-
-    :param year_month: 年月字符串，格式为 YYYYMM
-    :return: 包含已访问 URL 的集合
-    """
-    json_file_path = f"{year_month}_visited_urls.json"
-    urls_set = set()
-
-    # 尝试加载已存在的 JSON 文件
-    if os.path.exists(json_file_path):
-        with open(json_file_path, 'r', encoding='utf-8') as json_file:
-            urls_set = set(json.load(json_file))
-    logger.info(f"已加载 {year_month} 的已访问 URL{len(urls_set)}个")
-    return urls_set
-
-
 def generate_audio(text: str, output_file: str = "audio.wav", rewrite=False, time_tag: int = 0) -> None:
     if os.path.exists(output_file) and not rewrite:
         logger.info(f"{output_file}已存在，跳过生成音频。")
@@ -221,22 +256,6 @@ def generate_audio(text: str, output_file: str = "audio.wav", rewrite=False, tim
         os.system(sh)
 
 
-def append_and_save_month_urls(year_month: str, new_urls: set) -> None:
-    """
-    向指定年月的已访问 URL 集合中追加新 URL，并保存到 JSON 文件。
-
-    :param year_month: 年月字符串，格式为 YYYYMM
-    :param new_urls: 要追加的新 URL 集合
-    """
-    json_file_path = f"{year_month}_visited_urls.json"
-    existing_urls = load_month_urls(year_month)
-    updated_urls = existing_urls.union(new_urls)
-
-    with open(json_file_path, 'w', encoding='utf-8') as json_file:
-        json.dump(list(updated_urls), json_file, ensure_ascii=False, indent=4)
-    logger.info(f"已保存 {year_month} 的已访问URL {len(new_urls)} 个到 {json_file_path}")
-
-
 def remove_outdated_documents():
     import shutil
     from datetime import datetime, timedelta
@@ -14,6 +14,7 @@ from utils import *
 import time
 from typing import Dict
 from convert import convert
+from image_store import get_image_store
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
@@ -436,7 +437,8 @@ def generate_all_news_video(today: str = datetime.now().strftime("%Y%m%d"), time
             pixelated_img = os.path.join(dir_path, 'P_' + image)
             pixelated = True
             try:
-                convert(origin_img, pixelated_img)
+                # 同一张图片被多个新闻源或多期节目引用时只像素化一次
+                get_image_store().derive(origin_img, pixelated_img, 'pixel', convert)
             except Exception as e:
                 pixelated = False
                 logger.error(f'pixelate error {e}', exec_info=True)